@@ -1,15 +1,26 @@
-import requests
 import json
-import time
+import asyncio
 from datetime import datetime
+from rate_limit import AdaptiveRateController
+from request_policy import RequestPolicy
+from http_cache import HTTPCache
+from http_transport import make_session, format_connection_stats
+from ndjson_sink import NDJSONSink, iter_ndjson
 
 class WikipediaAPI:
-    def __init__(self):
+    def __init__(self, requests_per_second=5, cache=None, sink=None):
         self.base_url = "https://en.wikipedia.org/api/rest_v1"
         self.wiki_api_url = "https://en.wikipedia.org/w/api.php"
         self.headers = {
             'User-Agent': 'WikipediaAPIScraper/1.0 (https://example.com/contact)'
         }
+        self.rate_controller = AdaptiveRateController(max_rate=requests_per_second)
+        self.request_policy = RequestPolicy(hedge_percentile=95)
+        self.session = make_session(self.headers, cache, rate_controller=self.rate_controller,
+                                    policy=self.request_policy)
+        self.images_limit = 10
+        self.batch_size = 50
+        self.sink = sink
     
     def search_articles(self, query, limit=10):
         params = {
@@ -20,7 +31,7 @@ class WikipediaAPI:
             'srlimit': limit
         }
         
-        response = requests.get(self.wiki_api_url, params=params, headers=self.headers)
+        response = self.session.get(self.wiki_api_url, params=params)
         data = response.json()
         
         if 'query' in data and 'search' in data['query']:
@@ -32,7 +43,7 @@ class WikipediaAPI:
         url = f"{self.base_url}/page/summary/{clean_title}"
         
         try:
-            response = requests.get(url, headers=self.headers)
+            response = self.session.get(url)
             if response.status_code == 200:
                 return response.json()
             else:
@@ -50,8 +61,12 @@ class WikipediaAPI:
             'prop': 'sections'
         }
         
-        response = requests.get(self.wiki_api_url, params=params, headers=self.headers)
-        data = response.json()
+        try:
+            response = self.session.get(self.wiki_api_url, params=params)
+            data = response.json()
+        except Exception as e:
+            print(f"Exception getting sections for {title}: {e}")
+            return []
         
         if 'parse' in data and 'sections' in data['parse']:
             return data['parse']['sections']
@@ -63,11 +78,15 @@ class WikipediaAPI:
             'format': 'json',
             'titles': title,
             'prop': 'images',
-            'imlimit': 10
+            'imlimit': self.images_limit
         }
         
-        response = requests.get(self.wiki_api_url, params=params, headers=self.headers)
-        data = response.json()
+        try:
+            response = self.session.get(self.wiki_api_url, params=params)
+            data = response.json()
+        except Exception as e:
+            print(f"Exception getting images for {title}: {e}")
+            return []
         
         images = []
         if 'query' in data and 'pages' in data['query']:
@@ -77,6 +96,89 @@ class WikipediaAPI:
         
         return images
     
+    def _query_pages(self, params):
+        # Follow prop continuation (extracts/images) until every page in the batch is complete
+        pages = {}
+        first_response = None
+        request_params = dict(params)
+        
+        while True:
+            response = self.session.get(self.wiki_api_url, params=request_params)
+            data = response.json()
+            if first_response is None:
+                first_response = data
+            
+            for page_id, page_data in data.get('query', {}).get('pages', {}).items():
+                merged = pages.setdefault(page_id, {})
+                images = merged.get('images', []) + page_data.get('images', [])
+                merged.update(page_data)
+                merged['images'] = images
+            
+            continuation = {
+                key: value for key, value in data.get('continue', {}).items()
+                if key in ('continue', 'excontinue', 'imcontinue')
+            }
+            if len(continuation) <= 1:
+                break
+            request_params = dict(params, **continuation)
+        
+        return first_response or {}, pages
+    
+    def _page_content_params(self):
+        return {
+            'action': 'query',
+            'format': 'json',
+            'prop': 'extracts|images|info|description',
+            'exintro': 1,
+            'explaintext': 1,
+            'exlimit': 'max',
+            'imlimit': 'max'
+        }
+    
+    def search_with_content(self, query, limit=10):
+        params = self._page_content_params()
+        params.update({
+            'list': 'search',
+            'srsearch': query,
+            'srlimit': limit,
+            'generator': 'search',
+            'gsrsearch': query,
+            'gsrlimit': limit
+        })
+        
+        data, pages = self._query_pages(params)
+        
+        search_results = data.get('query', {}).get('search', [])
+        pages_by_title = {page['title']: page for page in pages.values() if 'title' in page}
+        return search_results, pages_by_title
+    
+    def get_pages_batch(self, titles):
+        pages_by_title = {}
+        
+        for start in range(0, len(titles), self.batch_size):
+            chunk = titles[start:start + self.batch_size]
+            params = self._page_content_params()
+            params['titles'] = '|'.join(chunk)
+            
+            data, pages = self._query_pages(params)
+            
+            for page in pages.values():
+                if 'title' in page and 'missing' not in page:
+                    pages_by_title[page['title']] = page
+            for normalized in data.get('query', {}).get('normalized', []):
+                if normalized['to'] in pages_by_title:
+                    pages_by_title[normalized['from']] = pages_by_title[normalized['to']]
+        
+        return pages_by_title
+    
+    def _build_from_page(self, result, page, sections):
+        content = {
+            'extract': page.get('extract', ''),
+            'description': page.get('description', '')
+        } if page else None
+        images = [img['title'] for img in page.get('images', [])][:self.images_limit] if page else []
+        return self.build_article_data(result, content, sections, images)
+    
     def scrape_topic(self, query, num_articles=5):
         print(f"Searching for articles about: {query}")
 
@@ -98,32 +200,144 @@ class WikipediaAPI:
 
             images = self.get_page_images(title)
             
-            article_data = {
-                'title': title,
-                'search_snippet': result.get('snippet', ''),
-                'word_count': result.get('wordcount', 0),
-                'timestamp': result.get('timestamp', ''),
-                'summary': content.get('extract', '') if content else '',
-                'description': content.get('description', '') if content else '',
-                'url': f"https://en.wikipedia.org/wiki/{title.replace(' ', '_')}",
-                'sections': [section['line'] for section in sections],
-                'images_count': len(images),
-                'scraped_at': datetime.now().isoformat()
-            }
-            
+            article_data = self.build_article_data(result, content, sections, images)
+            self.emit(query, article_data)
             articles_data.append(article_data)
-            
-            time.sleep(1)
         
         return articles_data
     
+    def scrape_topic_batched(self, query, num_articles=5):
+        print(f"Searching for articles about: {query}")
+
+        search_results, pages_by_title = self.search_with_content(query, num_articles)
+        
+        if not search_results:
+            print("No articles found!")
+            return []
+        
+        articles_data = []
+        
+        for i, result in enumerate(search_results[:num_articles], 1):
+            print(f"\nProcessing article {i}/{num_articles}: {result['title']}")
+            sections = self.get_page_sections(result['title'])
+            article_data = self._build_from_page(result, pages_by_title.get(result['title']), sections)
+            self.emit(query, article_data)
+            articles_data.append(article_data)
+        
+        return articles_data
+    
+    def scrape_titles_batched(self, titles):
+        pages_by_title = self.get_pages_batch(titles)
+        
+        articles_data = []
+        
+        for title in titles:
+            print(f"Processing article: {title}")
+            sections = self.get_page_sections(title)
+            article_data = self._build_from_page({'title': title}, pages_by_title.get(title), sections)
+            self.emit(None, article_data)
+            articles_data.append(article_data)
+        
+        return articles_data
+    
+    def emit(self, topic, article_data):
+        # Stream each record out as soon as it exists instead of holding the whole crawl
+        if self.sink:
+            self.sink.write({'topic': topic, **article_data} if topic else article_data)
+    
+    def build_article_data(self, result, content, sections, images):
+        title = result['title']
+        return {
+            'title': title,
+            'search_snippet': result.get('snippet', ''),
+            'word_count': result.get('wordcount', 0),
+            'timestamp': result.get('timestamp', ''),
+            'summary': content.get('extract', '') if content else '',
+            'description': content.get('description', '') if content else '',
+            'url': f"https://en.wikipedia.org/wiki/{title.replace(' ', '_')}",
+            'sections': [section['line'] for section in sections],
+            'images_count': len(images),
+            'scraped_at': datetime.now().isoformat()
+        }
+    
+    async def _in_thread(self, func, *args):
+        # The blocking fetch runs on a worker thread; the session's rate controller paces it per host
+        return await asyncio.to_thread(func, *args)
+    
+    async def scrape_article_async(self, result, query=None):
+        title = result['title']
+        content, sections, images = await asyncio.gather(
+            self._in_thread(self.get_page_content, title),
+            self._in_thread(self.get_page_sections, title),
+            self._in_thread(self.get_page_images, title)
+        )
+        print(f"Processed article: {title}")
+        article_data = self.build_article_data(result, content, sections, images)
+        self.emit(query, article_data)
+        return article_data
+    
+    async def scrape_topic_async(self, query, num_articles=5):
+        print(f"Searching for articles about: {query}")
+
+        search_results = await self._in_thread(self.search_articles, query, num_articles)
+        
+        if not search_results:
+            print(f"No articles found for '{query}'!")
+            return []
+        
+        return list(await asyncio.gather(
+            *(self.scrape_article_async(result, query) for result in search_results[:num_articles])
+        ))
+    
+    async def scrape_topic_batched_async(self, query, num_articles=5):
+        print(f"Searching for articles about: {query}")
+
+        search_results, pages_by_title = await self._in_thread(self.search_with_content, query, num_articles)
+        
+        if not search_results:
+            print(f"No articles found for '{query}'!")
+            return []
+        
+        search_results = search_results[:num_articles]
+        # Sections need action=parse, the only per-page request left in the batched path
+        all_sections = await asyncio.gather(
+            *(self._in_thread(self.get_page_sections, result['title'])
+              for result in search_results)
+        )
+        
+        articles_data = []
+        for result, sections in zip(search_results, all_sections):
+            article_data = self._build_from_page(result, pages_by_title.get(result['title']), sections)
+            self.emit(query, article_data)
+            articles_data.append(article_data)
+        
+        return articles_data
+    
+    async def scrape_topics_async(self, topics, num_articles=5, batched=False):
+        scrape = self.scrape_topic_batched_async if batched else self.scrape_topic_async
+        results = await asyncio.gather(
+            *(scrape(topic, num_articles) for topic in topics),
+            return_exceptions=True
+        )
+        
+        # A failing topic is reported and left empty instead of cancelling the others
+        scraped = {}
+        for topic, result in zip(topics, results):
+            if isinstance(result, Exception):
+                print(f"Error scraping topic '{topic}': {result}")
+                result = []
+            scraped[topic] = result
+        return scraped
+    
     def save_to_file(self, data, filename):
         with open(filename, 'w', encoding='utf-8') as f:
             json.dump(data, f, indent=2, ensure_ascii=False)
         print(f"Data saved to {filename}")
 
-def main():
-    wiki_api = WikipediaAPI()
+def main(concurrent=True, batched=True):
+    output_file = 'wikipedia_api_data.ndjson'
+    sink = NDJSONSink(output_file, append=False)
+    wiki_api = WikipediaAPI(cache=HTTPCache(), sink=sink)
 
     topics = [
         "Python programming",
@@ -135,19 +349,30 @@ def main():
     
     all_data = {}
     
-    for topic in topics:
+    if concurrent:
         print(f"\n{'='*50}")
-        print(f"SCRAPING TOPIC: {topic}")
+        print(f"SCRAPING {len(topics)} TOPICS CONCURRENTLY")
         print(f"{'='*50}")
 
-        articles = wiki_api.scrape_topic(topic, num_articles=3)
-        all_data[topic] = articles
+        all_data = asyncio.run(wiki_api.scrape_topics_async(topics, num_articles=3, batched=batched))
         
-        print(f"Completed scraping {len(articles)} articles for '{topic}'")
+        for topic, articles in all_data.items():
+            print(f"Completed scraping {len(articles)} articles for '{topic}'")
+    else:
+        for topic in topics:
+            print(f"\n{'='*50}")
+            print(f"SCRAPING TOPIC: {topic}")
+            print(f"{'='*50}")
 
-        time.sleep(2)
+            if batched:
+                articles = wiki_api.scrape_topic_batched(topic, num_articles=3)
+            else:
+                articles = wiki_api.scrape_topic(topic, num_articles=3)
+            all_data[topic] = articles
+            
+            print(f"Completed scraping {len(articles)} articles for '{topic}'")
 
-    wiki_api.save_to_file(all_data, 'wikipedia_api_data.json')
+    sink.close()
 
     print(f"\n{'='*50}")
     print("SCRAPING SUMMARY")
@@ -156,11 +381,14 @@ def main():
     total_articles = sum(len(articles) for articles in all_data.values())
     print(f"Total topics scraped: {len(topics)}")
     print(f"Total articles collected: {total_articles}")
-    print(f"Data saved to: wikipedia_api_data.json")
+    print(f"Data saved to: {output_file}")
+    print(format_connection_stats(wiki_api.session))
+    print(wiki_api.rate_controller.describe())
+    print(wiki_api.request_policy.describe())
+    wiki_api.request_policy.close()
     
-    if all_data:
-        first_topic = list(all_data.keys())[0]
-        first_article = all_data[first_topic][0]
+    first_article = next(iter_ndjson(output_file), None)
+    if first_article:
         print(f"\nSample article data structure:")
         print(f"Title: {first_article['title']}")
         print(f"Summary length: {len(first_article['summary'])} characters")
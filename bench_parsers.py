@@ -0,0 +1,78 @@
+import importlib.util
+import os
+import sys
+import tempfile
+import time
+
+from html_parsing import available_parsers
+
+
+def load_script(filename):
+    # The scraper scripts have spaces in their names, so they are loaded by path
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), filename)
+    spec = importlib.util.spec_from_file_location(filename.replace(' ', '_')[:-3], path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def strip_volatile(record):
+    return {key: value for key, value in record.items() if key != 'scraped_at'}
+
+
+def time_pages(parse, pages, min_seconds=1.0):
+    runs = 0
+    start = time.perf_counter()
+    while True:
+        for url, content in pages:
+            parse(content, url)
+        runs += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return runs * len(pages) / elapsed
+
+
+def main(paths):
+    wiki = load_script('http wiki.py')
+    nasa = load_script('http nasa.py')
+
+    wiki_pages, nasa_pages = [], []
+    for path in paths:
+        with open(path, 'rb') as f:
+            content = f.read()
+        url = 'file://' + os.path.abspath(path)
+        if b'mw-content-text' in content:
+            wiki_pages.append((url, content))
+        else:
+            nasa_pages.append((url, content))
+
+    print(f"Pages: {len(wiki_pages)} Wikipedia, {len(nasa_pages)} NASA")
+    print(f"{'page type':<12}{'parser':<14}{'restricted':<12}{'pages/s':>10}  output")
+
+    scratch_dir = tempfile.mkdtemp(prefix='bench_parsers_')
+    baseline_wiki = wiki.WikipediaHTTPScraper(parser='html.parser', restrict_parsing=False)
+    expected_wiki = [strip_volatile(baseline_wiki.parse_page_content(c, u)) for u, c in wiki_pages]
+    baseline_nasa = nasa.NASAImageScraper(output_dir=scratch_dir, parser='html.parser')
+    expected_nasa = [strip_volatile(baseline_nasa.parse_article_data(c, u)) for u, c in nasa_pages]
+
+    for parser in available_parsers():
+        if wiki_pages:
+            for restricted in (False, True):
+                scraper = wiki.WikipediaHTTPScraper(parser=parser, restrict_parsing=restricted)
+                output = [strip_volatile(scraper.parse_page_content(c, u)) for u, c in wiki_pages]
+                rate = time_pages(scraper.parse_page_content, wiki_pages)
+                status = 'identical' if output == expected_wiki else 'DIFFERS'
+                print(f"{'wikipedia':<12}{parser:<14}{str(restricted):<12}{rate:>10.1f}  {status}")
+        if nasa_pages:
+            scraper = nasa.NASAImageScraper(output_dir=scratch_dir, parser=parser)
+            output = [strip_volatile(scraper.parse_article_data(c, u)) for u, c in nasa_pages]
+            rate = time_pages(scraper.parse_article_data, nasa_pages)
+            status = 'identical' if output == expected_nasa else 'DIFFERS'
+            print(f"{'nasa':<12}{parser:<14}{'False':<12}{rate:>10.1f}  {status}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python bench_parsers.py saved_page.html [saved_page.html ...]")
+        sys.exit(1)
+    main(sys.argv[1:])
@@ -0,0 +1,202 @@
+import json
+import os
+from datetime import date
+
+import numpy as np
+
+from ndjson_sink import NDJSONSink, iter_ndjson
+
+METRICS = ('cases', 'deaths', 'recovered')
+
+
+def timeline_key_to_iso(key):
+    month, day, year = (int(part) for part in key.split('/'))
+    if year < 100:
+        year += 2000
+    return date(year, month, day).isoformat()
+
+
+def iso_to_timeline_key(iso_date):
+    day = date.fromisoformat(iso_date)
+    return f"{day.month}/{day.day}/{day.strftime('%y')}"
+
+
+class TimeSeriesStore:
+    """Local append-only store of daily COVID counts keyed by country and date.
+
+    Every new or corrected (country, date) point is appended as one NDJSON
+    line and replaying the log keeps the last value written, so a refresh
+    only has to download the days since the previous refresh plus a small
+    overlap for late corrections.
+    """
+
+    def __init__(self, path='covid_timeseries.ndjson'):
+        self.path = path
+        self.series = {}
+        self.refreshed = {}
+
+        for entry in iter_ndjson(path):
+            if 'refreshed' in entry:
+                self.refreshed[entry['country']] = entry['refreshed']
+            else:
+                self.series.setdefault(entry['country'], {})[entry['date']] = tuple(
+                    entry.get(metric, 0) for metric in METRICS
+                )
+        self.sink = NDJSONSink(path, append=True)
+
+    def days_to_fetch(self, countries, today=None, overlap=7):
+        """`lastdays` value covering every country in the list, or 'all' if one was never stored."""
+        today = today or date.today()
+        days = 0
+        for country in countries:
+            refreshed = self.refreshed.get(country)
+            if refreshed is None or country not in self.series:
+                return 'all'
+            days = max(days, (today - date.fromisoformat(refreshed)).days + overlap)
+        return max(days, 1)
+
+    def fetch_groups(self, countries, today=None, overlap=7):
+        """Split countries into `(lastdays, countries)` requests.
+
+        Countries that were never stored get their own 'all' request, so one
+        new or unknown country does not make the rest of its chunk download
+        its full history again.
+        """
+        new = [country for country in countries if country not in self.refreshed or country not in self.series]
+        known = [country for country in countries if country not in new]
+        groups = []
+        if known:
+            groups.append((self.days_to_fetch(known, today, overlap), known))
+        if new:
+            groups.append(('all', new))
+        return groups
+
+    def merge(self, country, timeline, today=None):
+        """Append the points of a disease.sh timeline that are new or changed."""
+        stored = self.series.setdefault(country, {})
+        changed = 0
+        metrics = [timeline.get(metric, {}) for metric in METRICS]
+
+        for key in timeline.get('cases', {}):
+            iso_date = timeline_key_to_iso(key)
+            values = tuple(metric.get(key) or 0 for metric in metrics)
+            if stored.get(iso_date) != values:
+                stored[iso_date] = values
+                self.sink.write({'country': country, 'date': iso_date, **dict(zip(METRICS, values))})
+                changed += 1
+
+        refreshed = (today or date.today()).isoformat()
+        self.refreshed[country] = refreshed
+        self.sink.write({'country': country, 'refreshed': refreshed})
+        return changed
+
+    def timeline(self, country):
+        """Full stored history in the disease.sh `timeline` layout."""
+        timeline = {metric: {} for metric in METRICS}
+        for iso_date in sorted(self.series.get(country, {})):
+            key = iso_to_timeline_key(iso_date)
+            for metric, value in zip(METRICS, self.series[country][iso_date]):
+                timeline[metric][key] = value
+        return timeline
+
+    def compact(self):
+        """Rewrite the log with one line per point, dropping superseded values."""
+        self.sink.close()
+        temp_path = self.path + '.tmp'
+        with NDJSONSink(temp_path, append=False) as sink:
+            for country, points in self.series.items():
+                for iso_date in sorted(points):
+                    sink.write({'country': country, 'date': iso_date, **dict(zip(METRICS, points[iso_date]))})
+                if country in self.refreshed:
+                    sink.write({'country': country, 'refreshed': self.refreshed[country]})
+        os.replace(temp_path, self.path)
+        self.sink = NDJSONSink(self.path, append=True)
+
+    def close(self):
+        self.sink.close()
+
+
+def export_columnar(directory, processed_by_country):
+    """Write processed daily series as fixed-width int64 matrices plus a date index.
+
+    Each metric becomes `<metric>.npy` with one row per country and one
+    column per date in `dates.npy`; days a country has no data for hold 0.
+    `countries.json` lists the row order and each country's valid range.
+    """
+    os.makedirs(directory, exist_ok=True)
+    processed_by_country = {key: value for key, value in processed_by_country.items() if value}
+    metrics = []
+    all_dates = []
+    for processed in processed_by_country.values():
+        all_dates.append(processed['columns']['date'])
+        metrics.extend(name for name in processed['columns'] if name != 'date' and name not in metrics)
+    dates = np.unique(np.concatenate(all_dates)) if all_dates else np.array([], dtype='datetime64[D]')
+
+    countries = []
+    matrices = {metric: np.zeros((len(processed_by_country), len(dates)), dtype=np.int64) for metric in metrics}
+    for row, (country, processed) in enumerate(processed_by_country.items()):
+        columns = processed['columns']
+        positions = np.searchsorted(dates, columns['date'])
+        for metric in metrics:
+            if metric in columns:
+                matrices[metric][row, positions] = columns[metric]
+        countries.append({
+            'key': country,
+            'country': processed.get('country', country),
+            'first_date': str(columns['date'][0]) if len(columns['date']) else None,
+            'last_date': str(columns['date'][-1]) if len(columns['date']) else None
+        })
+
+    def save_array(name, array):
+        # np.save appends .npy to names without it, so write under the final name via a temp file object
+        temp_path = os.path.join(directory, name + '.tmp')
+        with open(temp_path, 'wb') as f:
+            np.save(f, array)
+        os.replace(temp_path, os.path.join(directory, name))
+
+    save_array('dates.npy', dates)
+    for metric, matrix in matrices.items():
+        save_array(f'{metric}.npy', matrix)
+
+    temp_path = os.path.join(directory, 'countries.json.tmp')
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump({'metrics': metrics, 'countries': countries}, f, indent=2, ensure_ascii=False)
+    os.replace(temp_path, os.path.join(directory, 'countries.json'))
+
+
+class ColumnarSeries:
+    """Memory-mapped reader for a directory written by export_columnar.
+
+    Opening is instant whatever the size: the matrices are mapped, not read,
+    and slicing a country or date range only touches those pages.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, 'countries.json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        self.metrics = meta['metrics']
+        self.countries = meta['countries']
+        self.rows = {entry['key']: row for row, entry in enumerate(self.countries)}
+        self.dates = np.load(os.path.join(directory, 'dates.npy'), mmap_mode='r')
+        self.columns = {
+            metric: np.load(os.path.join(directory, f'{metric}.npy'), mmap_mode='r')
+            for metric in self.metrics
+        }
+
+    def date_slice(self, start=None, end=None):
+        lo = 0 if start is None else int(np.searchsorted(self.dates, np.datetime64(start, 'D'), side='left'))
+        hi = len(self.dates) if end is None else int(np.searchsorted(self.dates, np.datetime64(end, 'D'), side='right'))
+        return slice(lo, hi)
+
+    def series(self, country, metric, start=None, end=None):
+        window = self.date_slice(start, end)
+        return self.dates[window], self.columns[metric][self.rows[country], window]
+
+    def country(self, country, start=None, end=None):
+        window = self.date_slice(start, end)
+        row = self.rows[country]
+        frame = {'date': self.dates[window]}
+        for metric in self.metrics:
+            frame[metric] = self.columns[metric][row, window]
+        return frame
@@ -0,0 +1,99 @@
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+_FETCHER_DONE = object()
+
+
+def start_parse_pool(workers=None):
+    """Process pool for run_pipeline, with every worker already forked.
+
+    Workers are forked, so parse functions from scripts loaded by path
+    (the scrapers' file names have spaces) resolve without re-importing
+    them; platforms without fork get a RuntimeError. Forking while another
+    thread holds a lock can deadlock the child, so start the pool before
+    any thread pool or request has run, and reuse it for every
+    run_pipeline call.
+    """
+    try:
+        context = multiprocessing.get_context('fork')
+    except ValueError:
+        raise RuntimeError("fetch_pipeline needs the 'fork' start method, which this platform does not have") from None
+    workers = workers or os.cpu_count() or 1
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+    list(pool.map(int, range(workers)))
+    return pool
+
+
+def run_pipeline(items, fetch, parse, pool, fetch_workers=8, max_pending=32):
+    """Fetch items on threads and parse them in `pool`'s worker processes.
+
+    Yields `(item, result)` in completion order, with None for items whose
+    fetch or parse failed. `fetch(item)` returns raw content (None to skip).
+    `parse(content, item)` runs in another process, so it has to be a
+    module-level function (or a functools.partial of one) that returns
+    plain data. At most `max_pending` fetched pages are waiting for or
+    inside the parsers, so fetchers pause when parsing falls behind.
+    """
+    items = iter(items)
+    items_lock = threading.Lock()
+    slots = threading.Semaphore(max_pending)
+    events = queue.Queue()
+    stop = threading.Event()
+
+    def fetcher():
+        while True:
+            slots.acquire()
+            if stop.is_set():
+                break
+            with items_lock:
+                item = next(items, _FETCHER_DONE)
+            if item is _FETCHER_DONE:
+                break
+            try:
+                content = fetch(item)
+            except Exception as e:
+                print(f"Error fetching {item}: {e}")
+                content = None
+            events.put(('fetched', item, content))
+        events.put((_FETCHER_DONE, None, None))
+
+    futures = set()
+    threads = [threading.Thread(target=fetcher, daemon=True) for _ in range(fetch_workers)]
+    for thread in threads:
+        thread.start()
+
+    running, parsing = len(threads), 0
+    try:
+        while running or parsing:
+            kind, item, payload = events.get()
+            if kind is _FETCHER_DONE:
+                running -= 1
+            elif kind == 'fetched':
+                if payload is None:
+                    slots.release()
+                    yield item, None
+                    continue
+                parsing += 1
+                future = pool.submit(parse, payload, item)
+                futures.add(future)
+                future.add_done_callback(lambda done, item=item: events.put(('parsed', item, done)))
+            else:
+                parsing -= 1
+                futures.discard(payload)
+                slots.release()
+                try:
+                    result = payload.result()
+                except Exception as e:
+                    print(f"Error parsing {item}: {e}")
+                    result = None
+                yield item, result
+    finally:
+        stop.set()
+        for _ in threads:
+            slots.release()
+        # The pool outlives this run, so only drop the parses nobody will collect
+        for future in futures:
+            future.cancel()
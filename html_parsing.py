@@ -0,0 +1,37 @@
+from bs4 import BeautifulSoup, SoupStrainer
+
+# Backends build different trees from malformed markup, so faster ones are opt-in
+DEFAULT_PARSER = 'html.parser'
+
+try:
+    import lxml  # noqa: F401
+    FAST_PARSER = 'lxml'
+except ImportError:
+    FAST_PARSER = DEFAULT_PARSER
+
+# Subtrees the article scrapers actually read; everything else is never built
+WIKIPEDIA_ARTICLE_PARTS = SoupStrainer(id=['firstHeading', 'mw-content-text', 'catlinks'])
+LINKS_ONLY = SoupStrainer('a', href=True)
+
+
+def available_parsers():
+    parsers = ['html.parser']
+    for name in ('lxml', 'html5lib'):
+        try:
+            __import__(name)
+            parsers.append(name)
+        except ImportError:
+            pass
+    return parsers
+
+
+def make_soup(content, parser=None, parse_only=None):
+    """Build a BeautifulSoup tree with the chosen backend.
+
+    `parse_only` restricts the tree to the subtrees matched by a
+    SoupStrainer. html5lib ignores it, so it always builds the full tree.
+    """
+    parser = parser or DEFAULT_PARSER
+    if parser == 'html5lib':
+        parse_only = None
+    return BeautifulSoup(content, parser, parse_only=parse_only)
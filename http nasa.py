@@ -1,19 +1,292 @@
-import requests
-from bs4 import BeautifulSoup
 import json
 import time
 import os
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urljoin, urlparse
 import re
+from bisect import bisect_right
 from datetime import datetime
+from functools import partial
+from http_cache import HTTPCache
+from http_transport import make_session
+from rate_limit import AdaptiveRateController
+from request_policy import RequestPolicy
+from html_parsing import make_soup, LINKS_ONLY
+from fetch_pipeline import run_pipeline, start_parse_pool
+from ndjson_sink import NDJSONSink, iter_ndjson
+from work_queue import WorkQueue, default_worker_id, run_worker, shard_sink
+
+NASA_BASE_URL = "https://www.nasa.gov"
+
+MOON_KEYWORDS = [
+    'moon', 'lunar', 'artemis', 'apollo', 'crater', 'mare', 'moonrise', 
+    'moonset', 'full moon', 'new moon', 'crescent', 'gibbous',
+    'lunar eclipse', 'lunar mission', 'lunar surface', 'lunar rover',
+    'selenian', 'lunar orbit', 'lunar landing', 'moonlight',
+    'lunar phase', 'lunar cycle', 'earth moon', 'moon earth'
+]
+
+def parse_article_data(content, article_url, parser=None, base_url=NASA_BASE_URL):
+    # Module level so the fetch/parse pipeline can run it in a worker process
+    soup = make_soup(content, parser)
+    
+    title = None
+    for selector in ['h1', '.entry-title', '.article-title', 'h1.wp-block-heading']:
+        title_elem = soup.find(selector)
+        if title_elem:
+            title = title_elem.get_text().strip()
+            break
+
+    date = None
+    for selector in ['.date', '.entry-date', 'time', '.published']:
+        date_elem = soup.find(selector)
+        if date_elem:
+            date = date_elem.get_text().strip()
+            break
+
+    description = None
+    for selector in ['.description', '.entry-content p', '.article-content p', '.wp-block-paragraph']:
+        desc_elem = soup.find(selector)
+        if desc_elem:
+            description = desc_elem.get_text().strip()
+            break
+
+    img_url = None
+    for selector in ['.image img', '.entry-content img', '.article-image img', 'img']:
+        img_elem = soup.find(selector)
+        if img_elem and img_elem.get('src'):
+            img_src = img_elem['src']
+            img_url = urljoin(base_url, img_src)
+            if any(skip in img_src.lower() for skip in ['thumb', 'icon', 'logo', 'avatar']):
+                continue
+            break
+
+    metadata = {
+        'scraped_at': datetime.now().isoformat(),
+        'article_url': article_url,
+        'title': title or 'No title found',
+        'date': date or 'No date found',
+        'description': description or 'No description found',
+        'image_url': img_url,
+    }
+
+    content_elem = soup.find('div', class_='entry-content') or soup.find('div', class_='article-content')
+    if content_elem:
+        paragraphs = content_elem.find_all('p')
+        full_content = '\n'.join([p.get_text().strip() for p in paragraphs if p.get_text().strip()])
+        metadata['full_content'] = full_content[:1000]  
+    
+    return metadata
+
+def load_keywords(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+class RelevanceMatcher:
+    """Keyword relevance engine compiled once per scraper.
+
+    The keyword list becomes a single alternation regex (longest keywords
+    first). All scored fields of a record are joined and scanned in one pass;
+    the per-field hits are cached on the record under `relevance_hits`.
+    """
+
+    separator = '\x00'
+
+    def __init__(self, keywords=MOON_KEYWORDS, fields=('title', 'description', 'full_content')):
+        self.keywords = sorted({keyword.lower() for keyword in keywords}, key=len, reverse=True)
+        self.fields = fields
+        self.pattern = re.compile('|'.join(re.escape(keyword) for keyword in self.keywords))
+
+    def is_relevant(self, text):
+        return bool(text) and self.pattern.search(text.lower()) is not None
+
+    def field_hits(self, record):
+        hits = record.get('relevance_hits')
+        if hits is not None:
+            return hits
+
+        texts = [(record.get(field) or '').lower() for field in self.fields]
+        starts = []
+        offset = 0
+        for text in texts:
+            starts.append(offset)
+            offset += len(text) + len(self.separator)
+
+        hits = {field: [] for field in self.fields}
+        for match in self.pattern.finditer(self.separator.join(texts)):
+            field = self.fields[bisect_right(starts, match.start()) - 1]
+            if match.group() not in hits[field]:
+                hits[field].append(match.group())
+
+        record['relevance_hits'] = hits
+        return hits
+
+    def score(self, record):
+        return sum(1 for field_matches in self.field_hits(record).values() if field_matches)
+
+class CheckpointJournal:
+    """Append-only log of archive crawl progress.
+
+    Each event (page listing, processed article, image download) is a single
+    NDJSON line, so checkpointing costs one append instead of re-serialising
+    every record collected so far. Replaying the log rebuilds the crawl state.
+    """
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.page_links = {}
+        self.completed_pages = set()
+        self.articles = {}
+        self.downloads = {}
+
+        if resume:
+            self._replay()
+        self.sink = NDJSONSink(path, append=resume, flush_every=1, fsync_every=10)
+
+    def _replay(self):
+        for event in iter_ndjson(self.path):
+            kind = event.get('event')
+            if kind == 'page':
+                self.page_links[event['page']] = event['links']
+            elif kind == 'page_done':
+                self.completed_pages.add(event['page'])
+            elif kind == 'article':
+                self.articles[event['url']] = event.get('record')
+            elif kind == 'download':
+                self.downloads[event['url']] = event.get('filename')
+
+    def log_page(self, page_num, links):
+        self.page_links[page_num] = links
+        self.sink.write({'event': 'page', 'page': page_num, 'links': links})
+
+    def log_page_done(self, page_num):
+        self.completed_pages.add(page_num)
+        self.sink.write({'event': 'page_done', 'page': page_num})
+
+    def log_article(self, article_url, record):
+        self.articles[article_url] = record
+        self.sink.write({'event': 'article', 'url': article_url, 'record': record})
+
+    def log_download(self, article_url, filename):
+        self.downloads[article_url] = filename
+        self.sink.write({'event': 'download', 'url': article_url, 'filename': filename})
+
+    def records(self):
+        records = []
+        for article_url, record in self.articles.items():
+            if record:
+                record = dict(record)
+                if article_url in self.downloads:
+                    record['local_image_filename'] = self.downloads[article_url]
+                records.append(record)
+        return records
+
+    def close(self):
+        self.sink.close()
+
+class ImageDownloadPool:
+    """Bounded worker pool that streams images straight to disk.
+
+    Bodies are written chunk by chunk to a temporary file that is atomically
+    renamed into place, so memory per download stays at `chunk_size` and a
+    half-written image never appears under its final name. Each host gets at
+    most `max_per_host` simultaneous transfers.
+    """
+
+    def __init__(self, session, max_workers=4, max_per_host=2, chunk_size=64 * 1024):
+        self.session = session
+        self.max_workers = max_workers
+        self.max_per_host = max_per_host
+        self.chunk_size = chunk_size
+        self._executor = None
+        self._host_slots = {}
+        self._lock = threading.Lock()
+        self.completed = 0
+        self.failed = 0
+        self.bytes_downloaded = 0
+        self.started_at = None
+        self.finished_at = None
+
+    def _host_slot(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.max_per_host)
+            return self._host_slots[host]
+
+    def stream_to_file(self, url, filepath):
+        with self._lock:
+            if self.started_at is None:
+                self.started_at = time.monotonic()
+
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(filepath), suffix='.part')
+        written = 0
+        try:
+            # The file object owns the descriptor from here, so every failure below closes it
+            with os.fdopen(fd, 'wb') as f:
+                with self._host_slot(url):
+                    with self.session.get(url, timeout=30, stream=True) as response:
+                        response.raise_for_status()
+                        for chunk in response.iter_content(chunk_size=self.chunk_size):
+                            f.write(chunk)
+                            written += len(chunk)
+            os.replace(temp_path, filepath)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            with self._lock:
+                self.failed += 1
+            raise
+
+        with self._lock:
+            self.completed += 1
+            self.bytes_downloaded += written
+            self.finished_at = time.monotonic()
+        return written
+
+    def submit(self, fn, *args, callback=None):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='image-download')
+        future = self._executor.submit(fn, *args)
+        if callback:
+            future.add_done_callback(lambda done: callback(done.result()))
+        return future
+
+    def wait(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def report(self):
+        elapsed = (self.finished_at - self.started_at) if self.started_at and self.finished_at else 0
+        megabytes = self.bytes_downloaded / (1024 * 1024)
+        return {
+            'completed': self.completed,
+            'failed': self.failed,
+            'megabytes': round(megabytes, 2),
+            'seconds': round(elapsed, 2),
+            'megabytes_per_second': round(megabytes / elapsed, 2) if elapsed else 0
+        }
 
 class NASAImageScraper:
-    def __init__(self, output_dir="nasa_images"):
-        self.base_url = "https://www.nasa.gov"
+    def __init__(self, output_dir="nasa_images", cache=None, download_workers=4, downloads_per_host=2, keywords=None, parser=None,
+                 parse_pool=None):
+        self.base_url = NASA_BASE_URL
         self.archive_url = "https://www.nasa.gov/image-of-the-day/?page={}"
         self.output_dir = output_dir
-        self.session = requests.Session()
-        self.session.headers.update({'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'})
+        self.rate_controller = AdaptiveRateController()
+        self.request_policy = RequestPolicy(hedge_percentile=95)
+        self.session = make_session({'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}, cache,
+                                    rate_controller=self.rate_controller, policy=self.request_policy)
+        self.relevance = RelevanceMatcher(keywords or MOON_KEYWORDS)
+        self.parser = parser
+        self.download_pool = ImageDownloadPool(self.session, max_workers=download_workers, max_per_host=downloads_per_host)
+        # Pass a pool from fetch_pipeline.start_parse_pool, started before any thread exists
+        self.parse_pool = parse_pool
+        self._owns_parse_pool = False
         
         os.makedirs(self.output_dir, exist_ok=True)
         os.makedirs(f"{self.output_dir}/images", exist_ok=True)
@@ -23,9 +296,6 @@ class NASAImageScraper:
     
     def download_image(self, img_url, title, index):
         try:
-            response = self.session.get(img_url, timeout=30)
-            response.raise_for_status()
-            
             parsed_url = urlparse(img_url)
             ext = os.path.splitext(parsed_url.path)[1] or '.jpg'
 
@@ -33,8 +303,7 @@ class NASAImageScraper:
             filename = f"{index:03d}_{safe_title}{ext}"
             filepath = os.path.join(self.output_dir, "images", filename)
 
-            with open(filepath, 'wb') as f:
-                f.write(response.content)
+            self.download_pool.stream_to_file(img_url, filepath)
             
             print(f"Downloaded: {filename}")
             return filename
@@ -43,150 +312,148 @@ class NASAImageScraper:
             print(f"Error downloading image {img_url}: {e}")
             return None
     
-    def scrape_article_data(self, article_url):
+    def queue_image_download(self, journal, article_data, index):
+        # The scrape loop moves on while the pool streams the image in the background
+        def record_result(filename):
+            article_data['local_image_filename'] = filename
+            journal.log_download(article_data['article_url'], filename)
+        
+        return self.download_pool.submit(
+            self.download_image, article_data['image_url'], article_data['title'], index,
+            callback=record_result
+        )
+    
+    def fetch_content(self, article_url):
         try:
             response = self.session.get(article_url, timeout=30)
             response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            title = None
-            for selector in ['h1', '.entry-title', '.article-title', 'h1.wp-block-heading']:
-                title_elem = soup.find(selector)
-                if title_elem:
-                    title = title_elem.get_text().strip()
-                    break
-
-            date = None
-            for selector in ['.date', '.entry-date', 'time', '.published']:
-                date_elem = soup.find(selector)
-                if date_elem:
-                    date = date_elem.get_text().strip()
-                    break
-
-            description = None
-            for selector in ['.description', '.entry-content p', '.article-content p', '.wp-block-paragraph']:
-                desc_elem = soup.find(selector)
-                if desc_elem:
-                    description = desc_elem.get_text().strip()
-                    break
-
-            img_url = None
-            for selector in ['.image img', '.entry-content img', '.article-image img', 'img']:
-                img_elem = soup.find(selector)
-                if img_elem and img_elem.get('src'):
-                    img_src = img_elem['src']
-                    img_url = urljoin(self.base_url, img_src)
-                    if any(skip in img_src.lower() for skip in ['thumb', 'icon', 'logo', 'avatar']):
-                        continue
-                    break
-
-            metadata = {
-                'scraped_at': datetime.now().isoformat(),
-                'article_url': article_url,
-                'title': title or 'No title found',
-                'date': date or 'No date found',
-                'description': description or 'No description found',
-                'image_url': img_url,
-            }
-
-            content_elem = soup.find('div', class_='entry-content') or soup.find('div', class_='article-content')
-            if content_elem:
-                paragraphs = content_elem.find_all('p')
-                full_content = '\n'.join([p.get_text().strip() for p in paragraphs if p.get_text().strip()])
-                metadata['full_content'] = full_content[:1000]  
-            
-            return metadata
+            return response.content
             
         except Exception as e:
             print(f"Error scraping article {article_url}: {e}")
             return None
     
+    def scrape_article_data(self, article_url):
+        content = self.fetch_content(article_url)
+        if content is None:
+            return None
+        return self.parse_article_data(content, article_url)
+    
+    def scrape_articles(self, article_urls, fetch_workers=8):
+        """Yield (url, article_data) pairs, fetching on threads while a process pool parses."""
+        self.start_parse_pool()
+        parse = partial(parse_article_data, parser=self.parser, base_url=self.base_url)
+        return run_pipeline(article_urls, self.fetch_content, parse, self.parse_pool, fetch_workers)
+    
+    def start_parse_pool(self):
+        if self.parse_pool is None:
+            self.parse_pool = start_parse_pool()
+            self._owns_parse_pool = True
+    
+    def close(self):
+        if self._owns_parse_pool:
+            self.parse_pool.shutdown()
+            self.parse_pool = None
+            self._owns_parse_pool = False
+    
+    def parse_article_data(self, content, article_url):
+        return parse_article_data(content, article_url, self.parser, self.base_url)
+    
     def is_moon_related(self, text):
-        if not text:
-            return False
-        
-        text_lower = text.lower()
-        moon_keywords = [
-            'moon', 'lunar', 'artemis', 'apollo', 'crater', 'mare', 'moonrise', 
-            'moonset', 'full moon', 'new moon', 'crescent', 'gibbous',
-            'lunar eclipse', 'lunar mission', 'lunar surface', 'lunar rover',
-            'selenian', 'lunar orbit', 'lunar landing', 'moonlight',
-            'lunar phase', 'lunar cycle', 'earth moon', 'moon earth'
-        ]
+        return self.relevance.is_relevant(text)
+
+    def get_archive_links(self, page_num):
+        url = self.archive_url.format(page_num)
+        response = self.session.get(url, timeout=30)
+        response.raise_for_status()
+        return self.parse_archive_links(response.content)
+
+    def parse_archive_links(self, content):
+        # Only the links are read from listing pages, so nothing else is built
+        soup = make_soup(content, self.parser, LINKS_ONLY)
+
+        article_links = []
+        for selector in ['a.article-link', '.entry-title a', '.post-title a', 'h2 a', 'h3 a']:
+            links = soup.find_all('a', href=True)
+            for link in links:
+                if '/image-of-the-day/' in link.get('href', ''):
+                    article_links.append([urljoin(self.base_url, link['href']), link.get_text().strip()])
+            if article_links:
+                break
         
-        return any(keyword in text_lower for keyword in moon_keywords)
+        return article_links
 
-    def scrape_archive_pages(self, num_pages=10):
-        data_list = []
-        moon_articles_found = 0
-        total_articles_checked = 0
+    def scrape_archive_pages(self, num_pages=10, resume=False):
+        # Fork the parse workers before resumed downloads start the download threads
+        self.start_parse_pool()
+        journal = CheckpointJournal(os.path.join(self.output_dir, 'checkpoint.ndjson'), resume=resume)
+        data_list = journal.records()
+        moon_articles_found = len(data_list)
+        total_articles_checked = len(journal.articles)
+        
+        if resume:
+            print(f"Resuming: {len(journal.completed_pages)} pages and {total_articles_checked} articles already processed")
+            for index, article_data in enumerate(data_list, 1):
+                # Records whose image never finished downloading get another attempt
+                if article_data['image_url'] and not article_data.get('local_image_filename'):
+                    self.queue_image_download(journal, article_data, index)
         
         for page_num in range(1, num_pages + 1):
+            if page_num in journal.completed_pages:
+                print(f"Skipping page {page_num} (already processed)")
+                continue
             print(f"Scraping page {page_num}...")
-            url = self.archive_url.format(page_num)
             
             try:
-                response = self.session.get(url, timeout=30)
-                response.raise_for_status()
-                soup = BeautifulSoup(response.content, 'html.parser')
-
-                article_links = []
-                for selector in ['a.article-link', '.entry-title a', '.post-title a', 'h2 a', 'h3 a']:
-                    links = soup.find_all('a', href=True)
-                    for link in links:
-                        if '/image-of-the-day/' in link.get('href', ''):
-                            article_links.append(link)
-                    if article_links:
-                        break
+                article_links = journal.page_links.get(page_num)
+                if article_links is None:
+                    article_links = self.get_archive_links(page_num)
+                    journal.log_page(page_num, article_links)
                 
                 print(f"Found {len(article_links)} articles on page {page_num}")
                 
-                for i, link in enumerate(article_links):
+                link_texts = {url: text for url, text in article_links if url not in journal.articles}
+                
+                # Results arrive in completion order; handle them in link order so numbering is stable
+                scraped = dict(self.scrape_articles(list(link_texts)))
+                for article_url, link_text in link_texts.items():
+                    article_data = scraped.get(article_url)
                     total_articles_checked += 1
-                    article_url = urljoin(self.base_url, link['href'])
     
-                    link_text = link.get_text().strip()
                     if not self.is_moon_related(link_text):
-                        article_data = self.scrape_article_data(article_url)
-                        if not article_data or not (
-                            self.is_moon_related(article_data.get('title', '')) or 
-                            self.is_moon_related(article_data.get('description', '')) or
-                            self.is_moon_related(article_data.get('full_content', ''))
-                        ):
+                        if not article_data or not self.relevance.score(article_data):
+                            if article_data:
+                                journal.log_article(article_url, None)
                             print(f"Skipping non-moon article: {link_text[:50]}...")
                             continue
-                    else:
-                        article_data = self.scrape_article_data(article_url)
                     
                     if article_data:
                         moon_articles_found += 1
                         print(f"🌙 Found moon-related article #{moon_articles_found}: {article_data['title'][:50]}...")
 
+                        article_data['moon_relevance_score'] = self.relevance.score(article_data)
+                        
+                        journal.log_article(article_url, article_data)
+
                         if article_data['image_url']:
-                            filename = self.download_image(
-                                article_data['image_url'], 
-                                article_data['title'], 
-                                moon_articles_found
-                            )
-                            article_data['local_image_filename'] = filename
-
-                        title_score = 1 if self.is_moon_related(article_data.get('title', '')) else 0
-                        desc_score = 1 if self.is_moon_related(article_data.get('description', '')) else 0
-                        content_score = 1 if self.is_moon_related(article_data.get('full_content', '')) else 0
-                        article_data['moon_relevance_score'] = title_score + desc_score + content_score
+                            self.queue_image_download(journal, article_data, moon_articles_found)
                         
                         data_list.append(article_data)
-
-                        if len(data_list) % 3 == 0:
-                            self.save_data(data_list, f"moon_articles_progress_{len(data_list)}.json")
-
-                    time.sleep(2)
+                
+                journal.log_page_done(page_num)
                 
             except Exception as e:
                 print(f"Error scraping page {page_num}: {e}")
                 continue
-            
-            time.sleep(3)
+        
+        self.download_pool.wait()
+        journal.close()
+        
+        downloads = self.download_pool.report()
+        print(f"\n⋆Image downloads: {downloads['completed']} done, {downloads['failed']} failed, "
+              f"{downloads['megabytes']} MB in {downloads['seconds']}s ({downloads['megabytes_per_second']} MB/s)")
+        print(f"⋆{self.rate_controller.describe()}")
+        print(f"⋆{self.request_policy.describe()}")
         
         print(f"\n⋆˖⁺‧₊☽Moon filtering summary☾₊‧⁺˖⋆")
         print(f"- ⋆Total articles checked: {total_articles_checked}")
@@ -221,13 +488,13 @@ class NASAImageScraper:
         print(f"⋆Successful downloads: {report['successful_downloads']}")
         print(f"⋆Date range: {report['date_range']['earliest']} to {report['date_range']['latest']}")
     
-    def run_full_scrape(self, num_pages=10):
+    def run_full_scrape(self, num_pages=10, resume=False):
         print(f"Starting NASA Image of the Day scraper...")
         print(f"Will scrape {num_pages} pages")
         
         start_time = datetime.now()
         
-        data_list = self.scrape_archive_pages(num_pages)
+        data_list = self.scrape_archive_pages(num_pages, resume=resume)
         
         if data_list:
             self.save_data(data_list)
@@ -238,6 +505,52 @@ class NASAImageScraper:
         
         return data_list
 
+def crawl_worker(queue_dir, num_pages=5, keywords=None, output_dir="nasa_images"):
+    """Run one archive crawl worker; start any number of them with the same queue_dir.
+
+    Archive pages become jobs that enqueue one job per article link. Each
+    worker writes its moon-related records to its own shard in queue_dir, and
+    images are numbered by page and link position, so workers never collide.
+    """
+    queue = WorkQueue(queue_dir)
+    queue.put_many(
+        ('archive_page', {'page': page_num}, f"archive_page:{page_num}") for page_num in range(1, num_pages + 1)
+    )
+
+    worker_id = default_worker_id()
+    sink = shard_sink(queue_dir, 'nasa_iotd_archive', worker_id)
+    scraper = NASAImageScraper(output_dir=output_dir, cache=HTTPCache(), keywords=keywords)
+
+    def scrape_page(payload):
+        links = scraper.get_archive_links(payload['page'])
+        queue.put_many(
+            ('article', {
+                'url': article_url,
+                'link_text': link_text,
+                'index': payload['page'] * 100 + position
+            }, f"article:{article_url}")
+            for position, (article_url, link_text) in enumerate(links)
+        )
+
+    def scrape_article(payload):
+        article_data = scraper.scrape_article_data(payload['url'])
+        if article_data is None:
+            raise RuntimeError(f"no content for {payload['url']}")
+        if not scraper.is_moon_related(payload['link_text']) and not scraper.relevance.score(article_data):
+            return
+        article_data['moon_relevance_score'] = scraper.relevance.score(article_data)
+        if article_data['image_url']:
+            article_data['local_image_filename'] = scraper.download_image(
+                article_data['image_url'], article_data['title'], payload['index']
+            )
+        sink.write(article_data)
+
+    done = run_worker(queue, {'archive_page': scrape_page, 'article': scrape_article}, worker_id)
+    sink.close()
+    print(f"Worker {worker_id} finished {done} jobs. Queue: {queue.counts()}")
+    scraper.request_policy.close()
+    queue.close()
+
 def analyze_scraped_data(json_file="nasa_images/nasa_iotd_archive.json"):
     try:
         with open(json_file, 'r') as f:
@@ -268,9 +581,22 @@ def analyze_scraped_data(json_file="nasa_images/nasa_iotd_archive.json"):
         print(f"Error analyzing data: {e}")
 
 if __name__ == "__main__":
-    scraper = NASAImageScraper()
+    keywords = None
+    if '--keywords' in sys.argv:
+        keywords = load_keywords(sys.argv[sys.argv.index('--keywords') + 1])
+    
+    if '--queue' in sys.argv:
+        # Several processes (or machines sharing the directory) can run this at once
+        crawl_worker(sys.argv[sys.argv.index('--queue') + 1], num_pages=5, keywords=keywords)
+        sys.exit(0)
+
+    # Fork the parse workers before the session, hedging or download threads exist
+    parse_pool = start_parse_pool()
+    scraper = NASAImageScraper(cache=HTTPCache(), keywords=keywords, parse_pool=parse_pool)
 
-    data = scraper.run_full_scrape(num_pages=5)  
+    data = scraper.run_full_scrape(num_pages=5, resume='--resume' in sys.argv)  
+    parse_pool.shutdown()
+    scraper.request_policy.close()
     
     analyze_scraped_data()
     
@@ -1,20 +1,222 @@
 import requests
-from bs4 import BeautifulSoup
+import html
+import itertools
 import json
-import time
+import random
 import re
+import sys
+import threading
+import time
 from datetime import datetime
-from urllib.parse import urljoin, quote
+from functools import partial
+from urllib.parse import urljoin, quote, urlparse, parse_qs, unquote
+from http_cache import HTTPCache
+from http_transport import make_session, transferred_bytes
+from rate_limit import AdaptiveRateController
+from request_policy import RequestPolicy
+from bs4.element import CData, NavigableString, Tag
+from html_parsing import make_soup, WIKIPEDIA_ARTICLE_PARTS
+from fetch_pipeline import run_pipeline, start_parse_pool
+from ndjson_sink import NDJSONSink, iter_ndjson
+from work_queue import WorkQueue, default_worker_id, run_worker, shard_sink
+from url_frontier import URLFrontier
+
+CATEGORY_LINK = re.compile(r'/wiki/Category:')
+
+# 'html' fetches the desktop /wiki/ page; 'parse' fetches only the rendered article from action=parse
+CONTENT_MODES = ('html', 'parse')
+
+def article_title(value):
+    """Normalized article title from a /wiki/ URL, an index.php?title= URL or a bare title."""
+    parsed = urlparse(value)
+    if parsed.scheme or value.startswith('/'):
+        if parsed.path.startswith('/wiki/'):
+            title = parsed.path[len('/wiki/'):]
+        else:
+            title = parse_qs(parsed.query).get('title', [parsed.path])[0]
+    else:
+        title = value
+    title = ' '.join(unquote(title).replace('_', ' ').split())
+    return title[:1].upper() + title[1:]
+
+def canonical_article_key(value, default_host='en.wikipedia.org'):
+    """One frontier key per article; the host keeps same-titled pages of different wikis apart."""
+    # en.m.wikipedia.org serves the same articles as en.wikipedia.org
+    host = (urlparse(value).netloc or default_host).lower().replace('.m.', '.', 1)
+    return f"{host}/{article_title(value)}"
+
+def article_url(title, base_url):
+    return urljoin(base_url, '/wiki/' + quote(title.replace(' ', '_')))
+
+def parse_page_content(content, url, parser=None, restrict_parsing=True):
+    # Module level so the fetch/parse pipeline can run it in a worker process
+    soup = make_soup(content, parser, WIKIPEDIA_ARTICLE_PARTS if restrict_parsing else None)
+    article = extract_article(soup)
+    
+    return {
+        'title': article['title'],
+        'url': url,
+        'introduction': ' '.join(article['intro']),
+        'sections': article['sections'],
+        'infobox': article['infobox'],
+        'images': article['images'][:10],  
+        'references_count': article['references_count'],
+        'categories': article['categories'][:10],  
+        'word_count': article['word_count'],
+        'scraped_at': datetime.now().isoformat()
+    }
+
+def parse_api_content(content, url, parser=None, restrict_parsing=True):
+    """Parse an action=parse response into the same record as the desktop page.
+
+    The article HTML, title and categories are laid out the way the desktop
+    page has them, so extract_article reads them unchanged.
+    """
+    data = json.loads(content)
+    if 'error' in data:
+        print(f"No article for {url}: {data['error'].get('info', data['error'].get('code'))}")
+        return None
+    page = data['parse']
+    # Visible categories first, as in the desktop catlinks box
+    categories = sorted(page.get('categories', ()), key=lambda category: category.get('hidden', False))
+    links = ''.join(
+        f'<a href="/wiki/Category:{quote(category["category"])}">{html.escape(category["category"].replace("_", " "))}</a>'
+        for category in categories
+    )
+    document = (
+        f'<h1 id="firstHeading">{page.get("displaytitle") or html.escape(page["title"])}</h1>'
+        f'<div id="mw-content-text">{page["text"]}</div>'
+        f'<div id="catlinks">{links}</div>'
+    )
+    return parse_page_content(document, url, parser, restrict_parsing)
+
+def timed_parse(parse, content, url):
+    start = time.perf_counter()
+    article = parse(content, url)
+    return article, time.perf_counter() - start
+
+def extract_article(soup):
+    """Collect every article field in a single walk over the document.
+
+    Flags on each stack frame say whether the node sits inside the main
+    content, the first infobox or the first reference list, so nothing is
+    searched twice. Words are counted per text node, joining a word that
+    is split across adjacent nodes (e.g. "ing" in "tail<i>ing</i>").
+    """
+    article = {
+        'title': '',
+        'intro': [],
+        'sections': [],
+        'infobox': {},
+        'images': [],
+        'references_count': 0,
+        'categories': [],
+        'word_count': 0
+    }
+    intro_seen = 0
+    found_title = found_content = found_infobox = found_reflist = False
+    text_types = {NavigableString, CData}
+    inside_word = False
+    
+    frames = [(iter(soup.contents), False, False, False)]
+    while frames:
+        children, in_content, in_infobox, in_reflist = frames[-1]
+        node = next(children, None)
+        if node is None:
+            frames.pop()
+            continue
+        
+        if not isinstance(node, Tag):
+            if in_content and type(node) in text_types:
+                words = node.split()
+                if words:
+                    article['word_count'] += len(words)
+                    if inside_word and not node[0].isspace():
+                        article['word_count'] -= 1
+                    inside_word = not node[-1].isspace()
+                elif node:
+                    inside_word = False
+            continue
+        
+        name = node.name
+        
+        if name == 'div':
+            if not found_content and node.get('id') == 'mw-content-text':
+                found_content = in_content = True
+                text_types = node.interesting_string_types or text_types
+            elif not found_reflist and 'reflist' in (node.get('class') or ()):
+                found_reflist = in_reflist = True
+        elif name == 'h1' and not found_title and node.get('id') == 'firstHeading':
+            found_title = True
+            article['title'] = node.get_text().strip()
+        elif name == 'table' and not found_infobox and 'infobox' in (node.get('class') or ()):
+            found_infobox = in_infobox = True
+        
+        if name == 'p' and in_content and intro_seen < 3:
+            intro_seen += 1
+            paragraph = node.get_text().strip()
+            if paragraph:
+                article['intro'].append(paragraph)
+        elif name in ('h2', 'h3', 'h4') and in_content and 'mw-headline' in (node.get('class') or ()):
+            article['sections'].append({
+                'level': node.parent.name,
+                'title': node.get_text().strip(),
+                'id': node.get('id', '')
+            })
+        elif name == 'tr' and in_infobox:
+            header = node.find('th')
+            data = node.find('td')
+            if header and data:
+                article['infobox'][header.get_text().strip()] = data.get_text().strip()
+        elif name == 'img' and node.get('src') is not None:
+            src = node.get('src')
+            if src and src.startswith('//'):
+                src = 'https:' + src
+            if 'upload.wikimedia.org' in src:
+                article['images'].append({
+                    'src': src,
+                    'alt': node.get('alt', ''),
+                    'width': node.get('width', ''),
+                    'height': node.get('height', '')
+                })
+        elif name == 'a':
+            if in_reflist:
+                article['references_count'] += 1
+            if CATEGORY_LINK.search(node.get('href') or ''):
+                category = node.get_text().strip()
+                if category:
+                    article['categories'].append(category)
+        
+        frames.append((iter(node.contents), in_content, in_infobox, in_reflist))
+    
+    return article
+
 
 class WikipediaHTTPScraper:
-    def __init__(self):
+    def __init__(self, cache=None, sink=None, parser=None, restrict_parsing=True, frontier=None,
+                 content_mode='html', parse_pool=None):
+        if content_mode not in CONTENT_MODES:
+            raise ValueError(f"content_mode must be one of {CONTENT_MODES}, not {content_mode!r}")
         self.base_url = "https://en.wikipedia.org"
         self.search_url = "https://en.wikipedia.org/w/index.php"
+        self.api_url = "https://en.wikipedia.org/w/api.php"
         self.headers = {
             'User-Agent': 'WikipediaHTTPScraper/1.0 (Educational Purpose)'
         }
-        self.session = requests.Session()
-        self.session.headers.update(self.headers)
+        self.rate_controller = AdaptiveRateController()
+        self.request_policy = RequestPolicy(hedge_percentile=95)
+        self.session = make_session(self.headers, cache, rate_controller=self.rate_controller,
+                                    policy=self.request_policy)
+        self.sink = sink
+        self.parser = parser
+        self.restrict_parsing = restrict_parsing
+        self.frontier = frontier
+        self.content_mode = content_mode
+        # Pass a pool from fetch_pipeline.start_parse_pool, started before any thread exists
+        self.parse_pool = parse_pool
+        self._owns_parse_pool = False
+        self.content_stats = {}
+        self._stats_lock = threading.Lock()
     
     def search_articles(self, query, limit=10):
         params = {
@@ -26,7 +228,7 @@ class WikipediaHTTPScraper:
         }
         
         response = self.session.get(self.search_url, params=params)
-        soup = BeautifulSoup(response.content, 'html.parser')
+        soup = make_soup(response.content, self.parser)
         
         results = []
         
@@ -50,91 +252,100 @@ class WikipediaHTTPScraper:
         
         return results
     
-    def scrape_page_content(self, url):
+    def fetch_content(self, url):
+        if self.content_mode == 'parse':
+            request_url = self.api_url
+            params = {
+                'action': 'parse',
+                'format': 'json',
+                'formatversion': 2,
+                'page': article_title(url),
+                'prop': 'text|categories|displaytitle',
+                'redirects': 1,
+                'disableeditsection': 1,
+                'disabletoc': 1,
+                'disablelimitreport': 1
+            }
+        else:
+            request_url, params = url, None
+        
         try:
-            response = self.session.get(url)
+            response = self.session.get(request_url, params=params)
             response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-
-            title_elem = soup.find('h1', id='firstHeading')
-            title = title_elem.get_text().strip() if title_elem else ''
-
-            content_div = soup.find('div', id='mw-content-text')
-
-            intro_paragraphs = content_div.find_all('p')[:3] if content_div else []
-            introduction = ' '.join([p.get_text().strip() for p in intro_paragraphs if p.get_text().strip()])
- 
-            sections = []
-            if content_div:
-                section_headers = content_div.find_all(['h2', 'h3', 'h4'], class_='mw-headline')
-                for header in section_headers:
-                    sections.append({
-                        'level': header.parent.name,
-                        'title': header.get_text().strip(),
-                        'id': header.get('id', '')
-                    })
-
-            infobox = {}
-            infobox_elem = soup.find('table', class_='infobox')
-            if infobox_elem:
-                rows = infobox_elem.find_all('tr')
-                for row in rows:
-                    header = row.find('th')
-                    data = row.find('td')
-                    if header and data:
-                        key = header.get_text().strip()
-                        value = data.get_text().strip()
-                        infobox[key] = value
-
-            images = []
-            img_tags = soup.find_all('img', src=True)
-            for img in img_tags:
-                src = img.get('src')
-                alt = img.get('alt', '')
-                if src and src.startswith('//'):
-                    src = 'https:' + src
-                if 'upload.wikimedia.org' in src:
-                    images.append({
-                        'src': src,
-                        'alt': alt,
-                        'width': img.get('width', ''),
-                        'height': img.get('height', '')
-                    })
-
-            references_section = soup.find('div', class_='reflist')
-            ref_count = 0
-            if references_section:
-                ref_links = references_section.find_all('a')
-                ref_count = len(ref_links)
-
-            categories = []
-            cat_links = soup.find_all('a', href=re.compile(r'/wiki/Category:'))
-            for cat_link in cat_links:
-                cat_name = cat_link.get_text().strip()
-                if cat_name:
-                    categories.append(cat_name)
-
-            main_content = content_div.get_text() if content_div else ''
-            word_count = len(main_content.split())
-            
-            return {
-                'title': title,
-                'url': url,
-                'introduction': introduction,
-                'sections': sections,
-                'infobox': infobox,
-                'images': images[:10],  
-                'references_count': ref_count,
-                'categories': categories[:10],  
-                'word_count': word_count,
-                'scraped_at': datetime.now().isoformat()
-            }
+            self._count_response(response)
+            return response.content
             
         except requests.RequestException as e:
             print(f"Error scraping {url}: {e}")
             return None
     
+    def scrape_page_content(self, url):
+        content = self.fetch_content(url)
+        if content is None:
+            return None
+        article, seconds = timed_parse(self.parse_page_content, content, url)
+        self._count_content('parse_seconds', seconds)
+        return article
+    
+    def scrape_pages(self, urls, fetch_workers=8):
+        """Yield (url, article) pairs, fetching on threads while a process pool parses."""
+        self.start_parse_pool()
+        parse = partial(timed_parse, self._content_parser())
+        for url, result in run_pipeline(urls, self.fetch_content, parse, self.parse_pool, fetch_workers):
+            if result is None:
+                yield url, None
+                continue
+            article, seconds = result
+            self._count_content('parse_seconds', seconds)
+            yield url, article
+    
+    def _content_parser(self):
+        parse = parse_api_content if self.content_mode == 'parse' else parse_page_content
+        return partial(parse, parser=self.parser, restrict_parsing=self.restrict_parsing)
+    
+    def _count_response(self, response):
+        self._count_content('pages', 1)
+        self._count_content('bytes', len(response.content))
+        transferred = transferred_bytes(response)
+        if transferred is None:
+            self._count_content('unmeasured', 1)
+        else:
+            self._count_content('transferred', transferred)
+    
+    def _count_content(self, name, amount):
+        with self._stats_lock:
+            stats = self.content_stats.setdefault(
+                self.content_mode, {'pages': 0, 'bytes': 0, 'transferred': 0, 'unmeasured': 0, 'parse_seconds': 0.0}
+            )
+            stats[name] += amount
+    
+    def describe_content_stats(self):
+        lines = []
+        with self._stats_lock:
+            for mode, stats in self.content_stats.items():
+                pages = stats['pages'] or 1
+                measured = stats['pages'] - stats['unmeasured']
+                if measured:
+                    transferred = (f"{stats['transferred'] / 1024:.0f} KB transferred "
+                                   f"({stats['transferred'] / measured / 1024:.1f} KB/page")
+                    if stats['unmeasured']:
+                        transferred += f"; unknown for {stats['unmeasured']} pages"
+                    transferred += ")"
+                else:
+                    transferred = "transferred size unknown"
+                lines.append(
+                    f"Content ({mode}): {stats['pages']} pages, {stats['bytes'] / 1024:.0f} KB decoded, "
+                    f"{transferred}, "
+                    f"{stats['parse_seconds']:.2f}s parsing ({stats['parse_seconds'] / pages * 1000:.0f} ms/page)"
+                )
+        return '\n'.join(lines) or "Content: no pages fetched"
+    
+    def parse_page_content(self, content, url):
+        return self._content_parser()(content, url)
+    
+    def extract_article(self, soup):
+        return extract_article(soup)
+    
     def get_random_articles(self, count=5):
         articles = []
         
@@ -143,12 +354,109 @@ class WikipediaHTTPScraper:
             response = self.session.get(random_url, allow_redirects=True)
             
             if response.status_code == 200:
-                article_data = self.scrape_page_content(response.url)
+                status, article_data = self.frontier.lookup(response.url) if self.frontier else ('new', None)
+                if status == 'seen':
+                    print(f"Random article {i+1}/{count} was scraped in an earlier run: {response.url}")
+                    continue
+                if article_data is None:
+                    if self.content_mode == 'parse':
+                        content = self.fetch_content(response.url)
+                    else:
+                        # The redirect already delivered the page, so parse it instead of fetching it again
+                        self._count_response(response)
+                        content = response.content
+                    if content is None:
+                        continue
+                    article_data, seconds = timed_parse(self._content_parser(), content, response.url)
+                    self._count_content('parse_seconds', seconds)
+                    if self.frontier and article_data:
+                        self.frontier.remember(article_data, response.url, article_url(article_data['title'], response.url))
                 if article_data:
+                    self.emit('Random Articles', article_data)
                     articles.append(article_data)
                     print(f"Scraped random article {i+1}/{count}: {article_data['title']}")
+        
+        return articles
+    
+    def iter_random_titles(self, batch_size=500, seed=None):
+        """Random main-namespace titles from list=random, `batch_size` (at most 500) per request.
+
+        list=random has no seed parameter. With a seed, the first request
+        passes a hand-built rncontinue of "<start>|<start>|0|0", which starts
+        the walk at a seeded point in page_random order. That is MediaWiki's
+        internal continuation format, not a documented API, so if the API
+        rejects it the titles are drawn unseeded instead. The same seed gives
+        the same titles only while the wiki does not change.
+        """
+        params = {
+            'action': 'query',
+            'format': 'json',
+            'list': 'random',
+            'rnnamespace': 0,
+            'rnlimit': min(500, batch_size)
+        }
+        if seed is not None:
+            start = f"{random.Random(seed).random():.12f}"
+            params['rncontinue'] = f"{start}|{start}|0|0"
+        
+        while True:
+            response = self.session.get(self.api_url, params=params)
+            data = response.json() if response.status_code == 200 else {}
+            error = data.get('error', {})
+            if error.get('code') == 'badcontinue' and seed is not None:
+                print("list=random rejected the seeded start; sampling without a seed")
+                params.pop('rncontinue')
+                seed = None
+                continue
+            if error or 'query' not in data:
+                print(f"Error sampling random titles: {error or response.status_code}")
+                return
+            yield from (page['title'] for page in data['query']['random'])
+            if 'continue' not in data:
+                return
+            params['rncontinue'] = data['continue']['rncontinue']
+    
+    def scrape_random_articles(self, count=5, seed=None, max_rounds=10):
+        """Sample titles in bulk and scrape them concurrently instead of following Special:Random.
+
+        Titles scraped in an earlier run or failing to scrape are replaced
+        by further samples, for up to `max_rounds` rounds, so callers get
+        `count` articles whenever the wiki can supply them.
+        """
+        titles = self.iter_random_titles(count, seed)
+        handled = set()
+        articles = []
+        
+        for _ in range(max_rounds):
+            if len(articles) >= count:
+                break
+            batch = list(itertools.islice(titles, count - len(articles)))
+            if not batch:
+                break
             
-            time.sleep(1)
+            urls = []
+            for title in batch:
+                url = article_url(title, self.base_url)
+                if url in handled:
+                    continue
+                handled.add(url)
+                status, article_data = self.frontier.lookup(url) if self.frontier else ('new', None)
+                if status == 'new':
+                    urls.append(url)
+                elif status == 'reused':
+                    self.emit('Random Articles', article_data)
+                    articles.append(article_data)
+                    print(f"Reusing random article {len(articles)}/{count}: {article_data['title']}")
+                else:
+                    print(f"Skipping random article scraped in an earlier run: {title}")
+            
+            for url, article_data in self.scrape_pages(urls):
+                if article_data:
+                    if self.frontier:
+                        self.frontier.remember(article_data, url, article_url(article_data['title'], url))
+                    self.emit('Random Articles', article_data)
+                    articles.append(article_data)
+                    print(f"Scraped random article {len(articles)}/{count}: {article_data['title']}")
         
         return articles
     
@@ -162,58 +470,143 @@ class WikipediaHTTPScraper:
             return []
         
         scraped_articles = []
-        
+        ranked = {}
         for i, result in enumerate(search_results, 1):
-            print(f"Scraping article {i}/{len(search_results)}: {result['title']}")
-
-            article_data = self.scrape_page_content(result['url'])
+            status, record = self.frontier.lookup(result['url']) if self.frontier else ('new', None)
+            if status == 'new':
+                ranked.setdefault(result['url'], (i, result))
+            elif status == 'reused':
+                # Already scraped for another topic: reuse the record with this topic's rank and snippet
+                print(f"Reusing article {i}/{len(search_results)}: {result['title']}")
+                article_data = {**record, 'search_snippet': result['snippet'], 'search_rank': i}
+                self.emit(query, article_data)
+                scraped_articles.append(article_data)
+            else:
+                print(f"Skipping article {i}/{len(search_results)} scraped in an earlier run: {result['title']}")
+        
+        for url, article_data in self.scrape_pages(list(ranked)):
+            i, result = ranked[url]
+            print(f"Scraped article {i}/{len(search_results)}: {result['title']}")
             
             if article_data:
+                if self.frontier:
+                    self.frontier.remember(dict(article_data), url, article_url(article_data['title'], url))
                 article_data['search_snippet'] = result['snippet']
                 article_data['search_rank'] = i
+                self.emit(query, article_data)
                 scraped_articles.append(article_data)
-
-            time.sleep(2)
         
+        scraped_articles.sort(key=lambda article: article['search_rank'])
         return scraped_articles
     
+    def start_parse_pool(self):
+        if self.parse_pool is None:
+            self.parse_pool = start_parse_pool()
+            self._owns_parse_pool = True
+    
+    def close(self):
+        if self._owns_parse_pool:
+            self.parse_pool.shutdown()
+            self.parse_pool = None
+            self._owns_parse_pool = False
+    
+    def emit(self, topic, article_data):
+        if self.sink:
+            self.sink.write({'topic': topic, **article_data})
+    
     def save_to_file(self, data, filename):
         with open(filename, 'w', encoding='utf-8') as f:
             json.dump(data, f, indent=2, ensure_ascii=False)
         print(f"Data saved to {filename}")
     
     def generate_report(self, data):
-        total_articles = sum(len(articles) for articles in data.values())
-        total_words = sum(
-            sum(article['word_count'] for article in articles)
-            for articles in data.values()
-        )
+        records = ({'topic': topic, **article} for topic, articles in data.items() for article in articles)
+        return self.generate_report_from_records(records, topics=data.keys())
+    
+    def generate_report_from_records(self, records, topics=()):
+        # Single pass over the records, so the report can be built straight from an NDJSON file
+        breakdown = {topic: {'articles': 0, 'words': 0, 'sections': 0, 'titles': []} for topic in topics}
+        
+        for article in records:
+            stats = breakdown.setdefault(article.get('topic'), {'articles': 0, 'words': 0, 'sections': 0, 'titles': []})
+            stats['articles'] += 1
+            stats['words'] += article['word_count']
+            stats['sections'] += len(article['sections'])
+            if len(stats['titles']) < 3:
+                stats['titles'].append(article['title'])
         
         report = {
             'scraping_summary': {
-                'total_topics': len(data),
-                'total_articles': total_articles,
-                'total_words': total_words,
+                'total_topics': len(breakdown),
+                'total_articles': sum(stats['articles'] for stats in breakdown.values()),
+                'total_words': sum(stats['words'] for stats in breakdown.values()),
                 'scraping_date': datetime.now().isoformat()
             },
             'topic_breakdown': {}
         }
         
-        for topic, articles in data.items():
-            topic_word_count = sum(article['word_count'] for article in articles)
-            avg_sections = sum(len(article['sections']) for article in articles) / len(articles) if articles else 0
+        for topic, stats in breakdown.items():
+            avg_sections = stats['sections'] / stats['articles'] if stats['articles'] else 0
             
             report['topic_breakdown'][topic] = {
-                'articles_count': len(articles),
-                'total_words': topic_word_count,
+                'articles_count': stats['articles'],
+                'total_words': stats['words'],
                 'average_sections': round(avg_sections, 2),
-                'top_articles': [article['title'] for article in articles[:3]]
+                'top_articles': stats['titles']
             }
         
         return report
 
-def main():
-    scraper = WikipediaHTTPScraper()
+def crawl_worker(queue_dir, topics, num_articles=3):
+    """Run one crawl worker; start any number of them with the same queue_dir.
+
+    Topics become jobs that enqueue one job per search result, and every
+    worker writes its articles to its own shard in queue_dir.
+    """
+    queue = WorkQueue(queue_dir)
+    queue.put_many(
+        ('topic', {'topic': topic, 'num_articles': num_articles}, f"topic:{topic}") for topic in topics
+    )
+
+    worker_id = default_worker_id()
+    sink = shard_sink(queue_dir, 'wikipedia_http_data', worker_id)
+    scraper = WikipediaHTTPScraper(cache=HTTPCache(), sink=sink)
+
+    def scrape_topic(payload):
+        results = scraper.search_articles(payload['topic'], payload['num_articles'])
+        queue.put_many(
+            ('article', {
+                'topic': payload['topic'],
+                'url': result['url'],
+                'rank': rank,
+                'snippet': result['snippet']
+            }, f"article:{payload['topic']}:{result['url']}")
+            for rank, result in enumerate(results, 1)
+        )
+
+    def scrape_article(payload):
+        article_data = scraper.scrape_page_content(payload['url'])
+        if article_data is None:
+            raise RuntimeError(f"no content for {payload['url']}")
+        article_data['search_snippet'] = payload['snippet']
+        article_data['search_rank'] = payload['rank']
+        scraper.emit(payload['topic'], article_data)
+
+    done = run_worker(queue, {'topic': scrape_topic, 'article': scrape_article}, worker_id)
+    sink.close()
+    print(f"Worker {worker_id} finished {done} jobs. Queue: {queue.counts()}")
+    scraper.request_policy.close()
+    queue.close()
+
+def main(content_mode='html'):
+    # Fork the parse workers before the session, hedging or fetch threads exist
+    parse_pool = start_parse_pool()
+    output_file = 'wikipedia_http_data.ndjson'
+    sink = NDJSONSink(output_file, append=False)
+    # Records from earlier runs are stored, so articles they scraped are written to this run's output too
+    frontier = URLFrontier(canonical_article_key, path='wikipedia_frontier.bloom', records_path='wikipedia_frontier.sqlite')
+    scraper = WikipediaHTTPScraper(cache=HTTPCache(), sink=sink, frontier=frontier, content_mode=content_mode,
+                                   parse_pool=parse_pool)
 
     topics = [
         "Climate Change",
@@ -223,30 +616,31 @@ def main():
         "Biotechnology"
     ]
     
-    all_scraped_data = {}
-
     for topic in topics:
         print(f"\n{'='*60}")
         print(f"SCRAPING TOPIC: {topic}")
         print(f"{'='*60}")
         
         articles = scraper.scrape_topic_comprehensive(topic, num_articles=3)
-        all_scraped_data[topic] = articles
         
         print(f"Completed {topic}: {len(articles)} articles scraped")
 
-        time.sleep(3)
-
     print(f"\n{'='*60}")
     print("SCRAPING RANDOM ARTICLES")
     print(f"{'='*60}")
     
-    random_articles = scraper.get_random_articles(5)
-    all_scraped_data['Random Articles'] = random_articles
-
-    scraper.save_to_file(all_scraped_data, 'wikipedia_http_data.json')
+    scraper.scrape_random_articles(5)
+    parse_pool.shutdown()
+    sink.close()
+    frontier.save()
+    frontier.close()
+    print(f"Frontier: {frontier.stats['new']} new pages, {frontier.stats['reused']} reused "
+          f"({frontier.stats['restored']} read back from disk), {frontier.stats['seen']} skipped, "
+          f"{frontier.stats['false_positives']} Bloom false positives refetched")
 
-    report = scraper.generate_report(all_scraped_data)
+    report = scraper.generate_report_from_records(
+        iter_ndjson(output_file), topics=topics + ['Random Articles']
+    )
     scraper.save_to_file(report, 'wikipedia_scraping_report.json')
 
     print(f"\n{'='*60}")
@@ -255,18 +649,29 @@ def main():
     print(f"Topics scraped: {len(topics) + 1}")
     print(f"Total articles: {report['scraping_summary']['total_articles']}")
     print(f"Total words: {report['scraping_summary']['total_words']:,}")
-    print(f"Main data: wikipedia_http_data.json")
+    print(f"Main data: {output_file}")
     print(f"Report: wikipedia_scraping_report.json")
+    print(scraper.rate_controller.describe())
+    print(scraper.request_policy.describe())
+    scraper.request_policy.close()
+    print(scraper.describe_content_stats())
 
-    if all_scraped_data:
-        first_topic = list(all_scraped_data.keys())[0]
-        if all_scraped_data[first_topic]:
-            sample_article = all_scraped_data[first_topic][0]
-            print(f"\nSample article: {sample_article['title']}")
-            print(f"Word count: {sample_article['word_count']}")
-            print(f"Sections: {len(sample_article['sections'])}")
-            print(f"Images: {len(sample_article['images'])}")
-            print(f"Categories: {len(sample_article['categories'])}")
+    sample_article = next(iter_ndjson(output_file), None)
+    if sample_article:
+        print(f"\nSample article: {sample_article['title']}")
+        print(f"Word count: {sample_article['word_count']}")
+        print(f"Sections: {len(sample_article['sections'])}")
+        print(f"Images: {len(sample_article['images'])}")
+        print(f"Categories: {len(sample_article['categories'])}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if '--queue' in sys.argv:
+        # python "http wiki.py" --queue DIR topics.txt  (one topic per line; run as many workers as needed)
+        queue_dir = sys.argv[sys.argv.index('--queue') + 1]
+        with open(sys.argv[sys.argv.index('--queue') + 2], 'r', encoding='utf-8') as f:
+            crawl_worker(queue_dir, [line.strip() for line in f if line.strip()])
+    elif '--content-mode' in sys.argv:
+        # python "http wiki.py" --content-mode parse  (compare the printed content stats with a default run)
+        main(sys.argv[sys.argv.index('--content-mode') + 1])
+    else:
+        main()
\ No newline at end of file
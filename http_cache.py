@@ -0,0 +1,224 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from http_transport import PooledAdapter
+
+# Headers describing the transfer rather than the stored (already decoded) body
+HOP_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'connection', 'keep-alive'}
+
+
+def parse_cache_control(value):
+    directives = {}
+    for part in (value or '').split(','):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, arg = part.partition('=')
+        directives[name.strip().lower()] = arg.strip().strip('"') or True
+    return directives
+
+
+def _http_date(value):
+    try:
+        return parsedate_to_datetime(value).timestamp() if value else None
+    except (TypeError, ValueError):
+        return None
+
+
+class HTTPCache:
+    """On-disk response store shared by every scraper session.
+
+    Entries live in a single SQLite file and are evicted least recently used
+    first once the stored bodies exceed `max_bytes`. `default_ttl` gives
+    responses without any freshness information a minimum lifetime.
+    """
+
+    def __init__(self, cache_dir='.http_cache', max_bytes=512 * 1024 * 1024, default_ttl=0):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.stats = {'hits': 0, 'revalidated': 0, 'misses': 0, 'stored': 0, 'evicted': 0}
+        self._lock = threading.Lock()
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(self.cache_dir, 'responses.sqlite'), check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                status INTEGER,
+                headers TEXT,
+                body BLOB,
+                size INTEGER,
+                stored_at REAL,
+                expires_at REAL,
+                last_access REAL
+            )
+        """)
+        self._db.execute('CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)')
+        self._db.commit()
+
+    def get(self, url):
+        with self._lock:
+            row = self._db.execute(
+                'SELECT status, headers, body, stored_at, expires_at FROM responses WHERE url = ?', (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute('UPDATE responses SET last_access = ? WHERE url = ?', (time.time(), url))
+            self._db.commit()
+
+        status, headers, body, stored_at, expires_at = row
+        return {
+            'status': status,
+            'headers': json.loads(headers),
+            'body': body,
+            'stored_at': stored_at,
+            'expires_at': expires_at
+        }
+
+    def set(self, url, status, headers, body):
+        headers = {key: value for key, value in headers.items() if key.lower() not in HOP_HEADERS}
+        now = time.time()
+
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (url, status, json.dumps(headers), body, len(body), now, self.expires_at(headers, now), now)
+            )
+            self._evict()
+            self._db.commit()
+        self.stats['stored'] += 1
+
+    def refresh(self, url, headers):
+        """Merge the headers of a 304 into the stored entry and restart its lifetime."""
+        entry = self.get(url)
+        if entry is None:
+            return None
+        merged = dict(entry['headers'])
+        merged.update({key: value for key, value in headers.items() if key.lower() not in HOP_HEADERS})
+        now = time.time()
+
+        with self._lock:
+            self._db.execute(
+                'UPDATE responses SET headers = ?, stored_at = ?, expires_at = ? WHERE url = ?',
+                (json.dumps(merged), now, self.expires_at(merged, now), url)
+            )
+            self._db.commit()
+
+        entry.update({'headers': merged, 'stored_at': now})
+        return entry
+
+    def expires_at(self, headers, now):
+        headers = CaseInsensitiveDict(headers)
+        cache_control = parse_cache_control(headers.get('Cache-Control'))
+        if 'no-cache' in cache_control:
+            return now
+
+        try:
+            age = float(headers.get('Age', 0))
+        except ValueError:
+            age = 0
+
+        if 'max-age' in cache_control:
+            try:
+                return now + max(int(cache_control['max-age']) - age, 0)
+            except ValueError:
+                return now
+
+        expires = _http_date(headers.get('Expires'))
+        if expires is not None:
+            date = _http_date(headers.get('Date')) or now
+            return now + max(expires - date, 0)
+
+        # Heuristic freshness (RFC 9111 4.2.2): a tenth of the time since the last change
+        last_modified = _http_date(headers.get('Last-Modified'))
+        if last_modified is not None:
+            heuristic = min((now - last_modified) / 10, 24 * 3600)
+            return now + max(heuristic, self.default_ttl)
+
+        return now + self.default_ttl
+
+    def _evict(self):
+        total = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for url, size in self._db.execute(
+            'SELECT url, size FROM responses ORDER BY last_access ASC'
+        ).fetchall():
+            self._db.execute('DELETE FROM responses WHERE url = ?', (url,))
+            self.stats['evicted'] += 1
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self):
+        with self._lock:
+            self._db.execute('DELETE FROM responses')
+            self._db.commit()
+
+
+class CachingAdapter(PooledAdapter):
+    """Transport adapter that answers GETs from an HTTPCache.
+
+    Fresh entries are served without touching the network. Stale entries
+    are revalidated with If-None-Match / If-Modified-Since, so an unchanged
+    page only costs a 304.
+    """
+
+    def __init__(self, cache, **kwargs):
+        self.cache = cache
+        super().__init__(**kwargs)
+
+    def send(self, request, stream=False, **kwargs):
+        request_cc = parse_cache_control(request.headers.get('Cache-Control'))
+        conditional = 'If-None-Match' in request.headers or 'If-Modified-Since' in request.headers
+        if request.method != 'GET' or stream or conditional or 'no-store' in request_cc:
+            return super().send(request, stream=stream, **kwargs)
+
+        entry = self.cache.get(request.url)
+        if entry and 'no-cache' not in request_cc and entry['expires_at'] > time.time():
+            self.cache.stats['hits'] += 1
+            return self._build_cached_response(request, entry)
+
+        if entry:
+            stored_headers = CaseInsensitiveDict(entry['headers'])
+            if stored_headers.get('ETag'):
+                request.headers['If-None-Match'] = stored_headers['ETag']
+            if stored_headers.get('Last-Modified'):
+                request.headers['If-Modified-Since'] = stored_headers['Last-Modified']
+
+        response = super().send(request, stream=False, **kwargs)
+
+        if response.status_code == 304 and entry:
+            self.cache.stats['revalidated'] += 1
+            entry = self.cache.refresh(request.url, response.headers) or entry
+            return self._build_cached_response(request, entry)
+
+        self.cache.stats['misses'] += 1
+        response_cc = parse_cache_control(response.headers.get('Cache-Control'))
+        if response.status_code == 200 and 'no-store' not in response_cc:
+            self.cache.set(request.url, response.status_code, response.headers, response.content)
+        response.from_cache = False
+        return response
+
+    def _build_cached_response(self, request, entry):
+        response = requests.Response()
+        response.status_code = entry['status']
+        response.reason = 'OK'
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response._content = entry['body']
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        response.from_cache = True
+        return response
@@ -0,0 +1,195 @@
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from urllib3.util.request import ACCEPT_ENCODING
+
+from rate_limit import parse_retry_after
+
+try:
+    import httpx
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# (connect, read) seconds for requests that do not pass their own timeout
+DEFAULT_TIMEOUT = (5, 30)
+
+
+class PooledAdapter(HTTPAdapter):
+    """Keep-alive transport shared by every scraper session.
+
+    Connections are pooled per host and reused across calls. Requests that
+    do not set a timeout get `timeout`. With `http2=True` (needs httpx and
+    h2), non-streaming requests are multiplexed over one HTTP/2 connection
+    per host; streamed downloads keep using the HTTP/1.1 pools. A
+    `rate_controller` paces every request that reaches the network and is
+    fed each response's status, latency and Retry-After. A `policy`
+    (request_policy.RequestPolicy) adds retries and hedging on top; each
+    retry is paced like any other request, while a hedge copy rides on
+    the slot its original was admitted with.
+    """
+
+    def __init__(self, pool_connections=10, pool_maxsize=20, timeout=DEFAULT_TIMEOUT, http2=False,
+                 rate_controller=None, policy=None, **kwargs):
+        self.timeout = timeout
+        self.rate_controller = rate_controller
+        self.policy = policy
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self.stats = {}
+        self._stats_lock = threading.Lock()
+        self._client = None
+        super().__init__(pool_connections=pool_connections, pool_maxsize=pool_maxsize, **kwargs)
+
+        if self.http2:
+            self._client = httpx.Client(
+                http2=True,
+                limits=httpx.Limits(max_connections=pool_maxsize, max_keepalive_connections=pool_maxsize)
+            )
+
+    def send(self, request, stream=False, timeout=None, **kwargs):
+        timeout = timeout if timeout is not None else self.timeout
+        if self.policy is None:
+            self._admit(request)
+            return self._send_recorded(request, stream, timeout, **kwargs)
+        # Streamed bodies are read by the caller after send returns, so they are never hedged.
+        # Each attempt is paced once, before the policy starts timing or hedging it.
+        return self.policy.send(
+            lambda attempt: self._send_recorded(attempt, stream, timeout, **kwargs), request,
+            hedge=not stream, admit=self._admit
+        )
+
+    def _admit(self, request):
+        if self.rate_controller is not None:
+            self.rate_controller.wait(request.url)
+
+    def _send_recorded(self, request, stream, timeout, **kwargs):
+        controller = self.rate_controller
+        if controller is None:
+            return self._send(request, stream, timeout, **kwargs)
+
+        start = time.monotonic()
+        try:
+            response = self._send(request, stream, timeout, **kwargs)
+        except Exception:
+            controller.record(request.url, None, time.monotonic() - start)
+            raise
+        controller.record(request.url, response.status_code, time.monotonic() - start,
+                          parse_retry_after(response.headers.get('Retry-After')))
+        return response
+
+    def _send(self, request, stream, timeout, **kwargs):
+        if self._client and not stream:
+            return self._send_http2(request, timeout)
+
+        response = super().send(request, stream=stream, timeout=timeout, **kwargs)
+        pool = getattr(response.raw, '_pool', None)
+        if pool is not None:
+            # urllib3 counts per pool; keep the latest totals so evicted pools are not lost
+            with self._stats_lock:
+                self.stats[urlparse(request.url).netloc] = {
+                    'connections': pool.num_connections,
+                    'requests': pool.num_requests
+                }
+        return response
+
+    def _send_http2(self, request, timeout):
+        connect, read = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+        reply = self._client.request(
+            request.method,
+            request.url,
+            headers=dict(request.headers),
+            content=request.body,
+            timeout=httpx.Timeout(read, connect=connect)
+        )
+
+        with self._stats_lock:
+            host = self.stats.setdefault(urlparse(request.url).netloc, {'connections': 0, 'requests': 0})
+            host['requests'] += 1
+            host['connections'] = self._http2_connections()
+
+        response = requests.Response()
+        response.status_code = reply.status_code
+        response.reason = reply.reason_phrase
+        response.headers = CaseInsensitiveDict(reply.headers)
+        response._content = reply.content
+        response._content_consumed = True
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        response.http_version = reply.http_version
+        return response
+
+    def _http2_connections(self):
+        pool = getattr(self._client._transport, '_pool', None)
+        return len(getattr(pool, 'connections', ())) or 1
+
+    def close(self):
+        super().close()
+        if self._client:
+            self._client.close()
+
+
+def make_session(headers=None, cache=None, **adapter_kwargs):
+    """requests.Session with pooled keep-alive adapters and compression negotiation.
+
+    With an HTTPCache, the caching adapter is mounted instead; it takes the
+    same pool, timeout and http2 options.
+    """
+    session = requests.Session()
+    # urllib3 lists the encodings it can decode here (br/zstd when their packages are installed)
+    session.headers['Accept-Encoding'] = ACCEPT_ENCODING
+    if headers:
+        session.headers.update(headers)
+
+    if cache:
+        # http_cache builds on PooledAdapter, so it can only be imported here
+        from http_cache import CachingAdapter
+        adapter = CachingAdapter(cache, **adapter_kwargs)
+    else:
+        adapter = PooledAdapter(**adapter_kwargs)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def transferred_bytes(response):
+    """Body bytes that crossed the network: the compressed size, 0 for a cache hit, None if unknown."""
+    if getattr(response, 'from_cache', False):
+        return 0
+    if response.raw is not None and hasattr(response.raw, 'tell'):
+        return response.raw.tell()
+    # HTTP/2 responses arrive already decoded, so only a Content-Length tells the wire size
+    length = response.headers.get('Content-Length')
+    return int(length) if length else None
+
+
+def connection_stats(session):
+    """Requests sent and connections opened per host across the session's pooled adapters."""
+    stats = {}
+    seen = set()
+    for adapter in session.adapters.values():
+        if id(adapter) in seen or not isinstance(adapter, PooledAdapter):
+            continue
+        seen.add(id(adapter))
+        with adapter._stats_lock:
+            for host, counts in adapter.stats.items():
+                total = stats.setdefault(host, {'connections': 0, 'requests': 0})
+                total['connections'] += counts['connections']
+                total['requests'] += counts['requests']
+    return stats
+
+
+def format_connection_stats(session):
+    stats = connection_stats(session)
+    requests_sent = sum(counts['requests'] for counts in stats.values())
+    connections = sum(counts['connections'] for counts in stats.values())
+    reused = requests_sent - connections
+    share = reused / requests_sent * 100 if requests_sent else 0
+    return f"Connections: {requests_sent} requests over {connections} connections ({reused} reused, {share:.0f}%)"
@@ -1,66 +1,111 @@
-import requests
 import json
-import time
 from datetime import datetime
+from http_cache import HTTPCache
+from http_transport import make_session, format_connection_stats
+from rate_limit import AdaptiveRateController
+from request_policy import RequestPolicy
+from ndjson_sink import NDJSONSink, iter_ndjson
+from openlibrary_search import iter_search_docs
+
+# Columns scrape_topic emits straight from search results
+SEARCH_FIELDS = ["key", "title", "author_name", "first_publish_year", "edition_count"]
+
+# Output fields that only the /works/{olid}.json document can provide
+DETAIL_FIELDS = {
+    "description": lambda work: work.get("description", {}).get("value", "") if isinstance(work.get("description"), dict) else work.get("description", ""),
+    "subjects": lambda work: work.get("subjects", []),
+    "subject_places": lambda work: work.get("subject_places", []),
+    "subject_times": lambda work: work.get("subject_times", []),
+    "created": lambda work: work.get("created", {}).get("value", ""),
+    "last_modified": lambda work: work.get("last_modified", {}).get("value", "")
+}
+
+class LazyWorkDetails:
+    """Work document that is only requested the first time one of its fields is read."""
+
+    def __init__(self, loader, olid):
+        self.loader = loader
+        self.olid = olid
+        self.fetched = False
+        self._work = None
+
+    def get(self, field):
+        if not self.fetched:
+            self._work = (self.loader(self.olid) if self.olid else None) or {}
+            self.fetched = True
+        return DETAIL_FIELDS[field](self._work)
 
 class OpenLibraryAPI:
-    def __init__(self):
+    def __init__(self, cache=None, sink=None):
         self.base_url = "https://openlibrary.org"
         self.headers = {
             'User-Agent': 'OpenLibraryScraper/1.0 (https://example.com/contact)'
         }
+        self.rate_controller = AdaptiveRateController()
+        self.request_policy = RequestPolicy(hedge_percentile=95)
+        self.session = make_session(self.headers, cache, rate_controller=self.rate_controller,
+                                    policy=self.request_policy)
+        self.sink = sink
 
-    def search_books(self, query, limit=5):
+    def search_books(self, query, limit=5, fields=SEARCH_FIELDS):
         url = f"{self.base_url}/search.json"
         params = {
             "q": query,
             "limit": limit
         }
-        response = requests.get(url, params=params, headers=self.headers)
+        if fields:
+            params["fields"] = ",".join(fields)
+        response = self.session.get(url, params=params)
         if response.status_code == 200:
             return response.json().get("docs", [])
         else:
             print(f"Error search_books: {response.status_code}")
             return []
 
+    def iter_books(self, query, max_results=None, page_size=100, fields=SEARCH_FIELDS):
+        """Stream book records for a query, paging through search.json as they are consumed."""
+        for doc in iter_search_docs(self.session, query, page_size=page_size, max_results=max_results,
+                                    fields=fields, url=f"{self.base_url}/search.json"):
+            yield self.book_record(doc)
+
+    def book_record(self, book):
+        olid = book.get("key", "").replace("/works/", "")
+        return {
+            "title": book.get("title", "Unknown Title"),
+            "author": book.get("author_name", ["Unknown"])[0],
+            "first_publish_year": book.get("first_publish_year", "Unknown"),
+            "edition_count": book.get("edition_count", 0),
+            "key": olid,
+            "url": f"{self.base_url}/works/{olid}" if olid else "",
+            "scraped_at": datetime.now().isoformat()
+        }
+
     def get_book_details(self, olid):
         url = f"{self.base_url}/works/{olid}.json"
-        response = requests.get(url, headers=self.headers)
+        response = self.session.get(url)
         if response.status_code == 200:
             return response.json()
         else:
             print(f"Error get_book_details: {response.status_code}")
             return None
 
-    def scrape_topic(self, query, num_books=5):
+    def scrape_topic(self, query, num_books=5, detail_fields=()):
         print(f"Searching for books about: {query}")
-        search_results = self.search_books(query, num_books)
-
-        if not search_results:
-            print("No books found!")
-            return []
 
         books_data = []
-        for i, book in enumerate(search_results[:num_books], 1):
-            title = book.get("title", "Unknown Title")
-            olid = book.get("key", "").replace("/works/", "")
-            print(f"\nProcessing book {i}/{num_books}: {title}")
-
-            details = self.get_book_details(olid) if olid else {}
-
-            book_data = {
-                "title": title,
-                "author": book.get("author_name", ["Unknown"])[0],
-                "first_publish_year": book.get("first_publish_year", "Unknown"),           
-                "edition_count": book.get("edition_count", 0),
-                "key": olid,
-                "url": f"{self.base_url}/works/{olid}" if olid else "",
-                "scraped_at": datetime.now().isoformat()
-            }
+        for i, book_data in enumerate(self.iter_books(query, max_results=num_books), 1):
+            print(f"\nProcessing book {i}/{num_books}: {book_data['title']}")
+
+            details = LazyWorkDetails(self.get_book_details, book_data["key"])
+            for field in detail_fields:
+                book_data[field] = details.get(field)
 
+            if self.sink:
+                self.sink.write({"topic": query, **book_data})
             books_data.append(book_data)
-            time.sleep(1)
 
+        if not books_data:
+            print("No books found!")
         return books_data
 
     def save_to_file(self, data, filename):
@@ -70,7 +115,9 @@ class OpenLibraryAPI:
 
 
 def main():
-    ol_api = OpenLibraryAPI()
+    output_file = 'openlibrary_api_data.ndjson'
+    sink = NDJSONSink(output_file, append=False)
+    ol_api = OpenLibraryAPI(cache=HTTPCache(), sink=sink)
 
     topics = [
         "Python programming",
@@ -80,7 +127,7 @@ def main():
         "Data Science"
     ]
 
-    all_data = {}
+    total_books = 0
 
     for topic in topics:
         print(f"\n{'='*50}")
@@ -88,25 +135,26 @@ def main():
         print(f"{'='*50}")
 
         books = ol_api.scrape_topic(topic, num_books=3)
-        all_data[topic] = books
+        total_books += len(books)
 
         print(f"Completed scraping {len(books)} books for '{topic}'")
-        time.sleep(2)
 
-    ol_api.save_to_file(all_data, 'openlibrary_api_data.json')
+    sink.close()
 
     print(f"\n{'='*50}")
     print("SCRAPING SUMMARY")
     print(f"{'='*50}")
 
-    total_books = sum(len(books) for books in all_data.values())
     print(f"Total topics scraped: {len(topics)}")
     print(f"Total books collected: {total_books}")
-    print(f"Data saved to: openlibrary_api_data.json")
-
-    if all_data:
-        first_topic = list(all_data.keys())[0]
-        first_book = all_data[first_topic][0]
+    print(f"Data saved to: {output_file}")
+    print(format_connection_stats(ol_api.session))
+    print(ol_api.rate_controller.describe())
+    print(ol_api.request_policy.describe())
+    ol_api.request_policy.close()
+
+    first_book = next(iter_ndjson(output_file), None)
+    if first_book:
         print(f"\nSample book data structure:")
         print(f"Title: {first_book['title']}")
         print(f"Author: {first_book['author']}")
@@ -1,17 +1,43 @@
-import requests
 import json
-import time
-from datetime import datetime
+from datetime import datetime, timezone
+from http_cache import HTTPCache
+from http_transport import make_session
+from rate_limit import AdaptiveRateController
+from request_policy import RequestPolicy
+from ndjson_sink import NDJSONSink
+from openlibrary_index import OpenLibraryIndex
+from openlibrary_search import iter_search_docs
+
+# search.json columns that stand in for the work document when enriching in bulk
+BATCH_DETAIL_FIELDS = ["key", "title", "subject", "cover_edition_key", "last_modified_i"]
+
+
+def _text_value(value):
+    if isinstance(value, dict):
+        return value.get("value", "")
+    if isinstance(value, list):
+        return value[0] if value else ""
+    return value or ""
+
+
+def _modified_key(last_modified):
+    # search.json only has whole seconds, so the index compares timestamps to the second
+    return last_modified[:19] or None
 
 class OpenLibraryHTTPScraper:
-    def __init__(self):
+    def __init__(self, cache=None, sink=None, index=None):
         self.base_url = "https://openlibrary.org"
         self.search_url = f"{self.base_url}/search.json"
         self.headers = {
             "User-Agent": "OpenLibraryHTTPScraper/1.0 (Educational Purpose)"
         }
-        self.session = requests.Session()
-        self.session.headers.update(self.headers)
+        self.rate_controller = AdaptiveRateController()
+        self.request_policy = RequestPolicy(hedge_percentile=95)
+        self.session = make_session(self.headers, cache, rate_controller=self.rate_controller,
+                                    policy=self.request_policy)
+        self.sink = sink
+        self.index = index
+        self.batch_size = 50
 
     def search_books(self, query, limit=5):
         """Search books by query keyword"""
@@ -19,28 +45,34 @@ class OpenLibraryHTTPScraper:
         response = self.session.get(self.search_url, params=params)
         if response.status_code == 200:
             data = response.json()
-            results = []
-            for doc in data.get("docs", []):
-                results.append({
-                    "title": doc.get("title", "Unknown"),
-                    "author": doc.get("author_name", ["Unknown"])[0] if doc.get("author_name") else "Unknown",
-                    "first_publish_year": doc.get("first_publish_year", "Unknown"),
-                    "edition_count": doc.get("edition_count", 0),
-                    "key": doc.get("key", ""),
-                    "url": f"{self.base_url}{doc.get('key', '')}"
-                })
-            return results
+            return [self.normalize_doc(doc) for doc in data.get("docs", [])]
         else:
             print(f"Error searching books: {response.status_code}")
             return []
 
+    def iter_books(self, query, max_results=None, page_size=100):
+        """Stream normalised book records, prefetching the next search page in the background"""
+        for doc in iter_search_docs(self.session, query, page_size=page_size,
+                                    max_results=max_results, url=self.search_url):
+            yield self.normalize_doc(doc)
+
+    def normalize_doc(self, doc):
+        return {
+            "title": doc.get("title", "Unknown"),
+            "author": doc.get("author_name", ["Unknown"])[0] if doc.get("author_name") else "Unknown",
+            "first_publish_year": doc.get("first_publish_year", "Unknown"),
+            "edition_count": doc.get("edition_count", 0),
+            "key": doc.get("key", ""),
+            "url": f"{self.base_url}{doc.get('key', '')}"
+        }
+
     def get_book_details(self, olid):
         """Fetch details of a book by OLID (Open Library ID)"""
         url = f"{self.base_url}{olid}.json"
         response = self.session.get(url)
         if response.status_code == 200:
             data = response.json()
-            return {
+            details = {
                 "title": data.get("title", "Unknown"),
                 "description": data.get("description", {}).get("value", "") if isinstance(data.get("description"), dict) else data.get("description", ""),
                 "subjects": data.get("subjects", []),
@@ -48,25 +80,132 @@ class OpenLibraryHTTPScraper:
                 "last_modified": data.get("last_modified", {}).get("value", ""),
                 "scraped_at": datetime.now().isoformat()
             }
+            if self.index:
+                self.index.put(olid, details, _modified_key(details["last_modified"]))
+            return details
         else:
             print(f"Error get_book_details: {response.status_code}")
             return None
 
+    def get_books_details(self, keys, fallback_fields=("title", "description")):
+        """Details for many work keys using bulk endpoints instead of one request per work.
+
+        Works are looked up `batch_size` at a time through search.json, and
+        descriptions come from their cover editions via /api/books. Keys that
+        are still missing one of `fallback_fields` get a per-work request.
+        No bulk endpoint has the work's `created` date, so it stays empty
+        unless "created" is added to `fallback_fields`, at one request per work.
+        """
+        details = {}
+        pending = []
+        for key in dict.fromkeys(keys):
+            stored = self.index.get(key) if self.index else None
+            if stored:
+                details[key] = stored
+            else:
+                pending.append(key)
+
+        editions = {}
+        for start in range(0, len(pending), self.batch_size):
+            chunk = pending[start:start + self.batch_size]
+            params = {
+                "q": "key:(" + " OR ".join(f'"{key}"' for key in chunk) + ")",
+                "fields": ",".join(BATCH_DETAIL_FIELDS),
+                "limit": len(chunk)
+            }
+            response = self.session.get(self.search_url, params=params)
+            if response.status_code != 200:
+                print(f"Error batch details: {response.status_code}")
+                continue
+            for doc in response.json().get("docs", []):
+                last_modified = doc.get("last_modified_i")
+                details[doc["key"]] = {
+                    "title": doc.get("title", "Unknown"),
+                    "description": "",
+                    "subjects": doc.get("subject", []),
+                    # Not in the search index; only the per-work fallback fills it
+                    "created": "",
+                    # Same UTC format as the work document's last_modified
+                    "last_modified": datetime.fromtimestamp(last_modified, timezone.utc).replace(tzinfo=None).isoformat(timespec="microseconds") if last_modified else "",
+                    "scraped_at": datetime.now().isoformat()
+                }
+                if doc.get("cover_edition_key"):
+                    editions[f"OLID:{doc['cover_edition_key']}"] = doc["key"]
+
+        bibkeys = list(editions)
+        for start in range(0, len(bibkeys), self.batch_size):
+            chunk = bibkeys[start:start + self.batch_size]
+            params = {"bibkeys": ",".join(chunk), "jscmd": "details", "format": "json"}
+            response = self.session.get(f"{self.base_url}/api/books", params=params)
+            if response.status_code != 200:
+                print(f"Error batch editions: {response.status_code}")
+                continue
+            for bibkey, edition in response.json().items():
+                description = _text_value(edition.get("details", {}).get("description"))
+                if description and bibkey in editions:
+                    details[editions[bibkey]]["description"] = description
+
+        for key in pending:
+            if key in details and all(details[key].get(field) for field in fallback_fields):
+                if self.index:
+                    self.index.put(key, details[key], _modified_key(details[key]["last_modified"]))
+                continue
+            fetched = self.get_book_details(key)
+            if fetched:
+                details[key] = fetched
+
+        return details
+
+    def scrape_topic_batched(self, query, num_books=5):
+        print(f"Scraping topic (batched): {query}")
+
+        scraped_books = []
+        chunk = []
+        for book in self.iter_books(query, max_results=num_books):
+            chunk.append(book)
+            if len(chunk) == self.batch_size:
+                scraped_books.extend(self._enrich(query, chunk))
+                chunk = []
+        if chunk:
+            scraped_books.extend(self._enrich(query, chunk))
+
+        if not scraped_books:
+            print("No books found!")
+        return scraped_books
+
+    def _enrich(self, query, books):
+        details = self.get_books_details([book["key"] for book in books])
+        enriched = []
+        for book in books:
+            if book["key"] not in details:
+                continue
+            book.update(details[book["key"]])
+            if self.sink:
+                self.sink.write({"topic": query, **book})
+            enriched.append(book)
+        print(f"Enriched {len(enriched)}/{len(books)} books")
+        return enriched
+
     def scrape_topic_comprehensive(self, query, num_books=5):
         print(f"Scraping topic: {query}")
-        search_results = self.search_books(query, limit=num_books)
-        if not search_results:
-            print("No books found!")
-            return []
 
         scraped_books = []
-        for i, book in enumerate(search_results, 1):
-            print(f"Scraping book {i}/{len(search_results)}: {book['title']}")
-            details = self.get_book_details(book["key"])
+        found = 0
+        for i, book in enumerate(self.iter_books(query, max_results=num_books), 1):
+            found = i
+            print(f"Scraping book {i}/{num_books}: {book['title']}")
+            # Works repeated across topics come from the local index instead of the network
+            details = self.index.get(book["key"]) if self.index else None
+            if details is None:
+                details = self.get_book_details(book["key"])
             if details:
                 book.update(details)
+                if self.sink:
+                    self.sink.write({"topic": query, **book})
                 scraped_books.append(book)
-            time.sleep(1)  # biar ga keblok rate-limit
+
+        if not found:
+            print("No books found!")
         return scraped_books
 
     def save_to_file(self, data, filename):
@@ -76,20 +215,27 @@ class OpenLibraryHTTPScraper:
 
 
 def main():
-    scraper = OpenLibraryHTTPScraper()
+    output_file = "openlibrary_http_data.ndjson"
+    sink = NDJSONSink(output_file, append=False)
+    index = OpenLibraryIndex()
+    scraper = OpenLibraryHTTPScraper(cache=HTTPCache(), sink=sink, index=index)
     topics = ["Data Science", "Machine Learning", "Artificial Intelligence"]
 
-    all_scraped_data = {}
     for topic in topics:
         print("="*60)
         print(f"SCRAPING TOPIC: {topic}")
         print("="*60)
-        books = scraper.scrape_topic_comprehensive(topic, num_books=3)
-        all_scraped_data[topic] = books
+        books = scraper.scrape_topic_batched(topic, num_books=3)
         print(f"Completed {topic}: {len(books)} books scraped")
-        time.sleep(2)
 
-    scraper.save_to_file(all_scraped_data, "openlibrary_http_data.json")
+    sink.close()
+    print(f"Work index: {index.count()} records, {index.stats['memory_hits'] + index.stats['disk_hits']} lookups served locally, "
+          f"{index.stats['misses'] + index.stats['stale']} fetched")
+    index.close()
+    print(scraper.rate_controller.describe())
+    print(scraper.request_policy.describe())
+    scraper.request_policy.close()
+    print(f"Data saved to {output_file}")
     print("SCRAPING COMPLETED!")
 
 
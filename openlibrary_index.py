@@ -0,0 +1,95 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class OpenLibraryIndex:
+    """Local store of fetched Open Library records keyed by OLID path.
+
+    Keys are the paths Open Library uses, e.g. `/works/OL45883W` or
+    `/authors/OL23919A`, so works and authors share one table. A small
+    in-process LRU sits in front of the SQLite file. An entry counts as
+    current until `max_age` seconds have passed since it was last fetched;
+    after that `get` reports a miss and the caller fetches it again.
+    """
+
+    def __init__(self, path='openlibrary_index.sqlite', max_age=30 * 24 * 3600, lru_size=1024):
+        self.path = path
+        self.max_age = max_age
+        self.lru_size = lru_size
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'stale': 0, 'stored': 0, 'unchanged': 0}
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS records (
+                olid TEXT PRIMARY KEY,
+                kind TEXT,
+                data TEXT,
+                last_modified TEXT,
+                fetched_at REAL
+            )
+        """)
+        self._db.commit()
+
+    def _remember(self, olid, entry):
+        self._lru[olid] = entry
+        self._lru.move_to_end(olid)
+        while len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+    def _lookup(self, olid):
+        entry = self._lru.get(olid)
+        if entry is not None:
+            self._lru.move_to_end(olid)
+            return entry, 'memory_hits'
+
+        row = self._db.execute(
+            'SELECT data, last_modified, fetched_at FROM records WHERE olid = ?', (olid,)
+        ).fetchone()
+        if row is None:
+            return None, 'misses'
+        entry = {'data': json.loads(row[0]), 'last_modified': row[1], 'fetched_at': row[2]}
+        self._remember(olid, entry)
+        return entry, 'disk_hits'
+
+    def get(self, olid):
+        """Stored record for `olid`, or None if it is unknown or older than `max_age`."""
+        with self._lock:
+            entry, outcome = self._lookup(olid)
+        if entry is not None and time.time() - entry['fetched_at'] > self.max_age:
+            entry, outcome = None, 'stale'
+        self.stats[outcome] += 1
+        return entry['data'] if entry else None
+
+    def put(self, olid, data, last_modified=None):
+        entry = {'data': data, 'last_modified': last_modified, 'fetched_at': time.time()}
+        kind = olid.strip('/').split('/')[0]
+
+        with self._lock:
+            previous, _ = self._lookup(olid)
+            if previous is not None and last_modified and previous['last_modified'] == last_modified:
+                self.stats['unchanged'] += 1
+            self._db.execute(
+                'INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?)',
+                (olid, kind, json.dumps(data, ensure_ascii=False), last_modified, entry['fetched_at'])
+            )
+            self._db.commit()
+            self._remember(olid, entry)
+        self.stats['stored'] += 1
+
+    def count(self):
+        with self._lock:
+            return self._db.execute('SELECT COUNT(*) FROM records').fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
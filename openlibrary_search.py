@@ -0,0 +1,49 @@
+from concurrent.futures import ThreadPoolExecutor
+
+SEARCH_URL = "https://openlibrary.org/search.json"
+
+
+def iter_search_docs(session, query, page_size=100, max_results=None, fields=None, url=SEARCH_URL):
+    """Page through search.json and yield the result documents one at a time.
+
+    The next page is requested in the background while the caller works
+    through the current one, so at most two pages are held in memory.
+    Iteration stops at `max_results`, at the last page, or as soon as the
+    caller stops consuming the generator.
+    """
+    params = {"q": query}
+    if fields:
+        params["fields"] = ",".join(fields)
+
+    def page_limit(offset):
+        if max_results is None:
+            return page_size
+        return min(page_size, max_results - offset)
+
+    def fetch(offset):
+        response = session.get(url, params={**params, "offset": offset, "limit": page_limit(offset)})
+        if response.status_code != 200:
+            print(f"Error search page at offset {offset}: {response.status_code}")
+            return None
+        return response.json()
+
+    executor = ThreadPoolExecutor(max_workers=1)
+    try:
+        offset = 0
+        pending = executor.submit(fetch, offset) if page_limit(offset) > 0 else None
+        while pending:
+            data = pending.result()
+            if not data:
+                return
+            docs = data.get("docs", [])
+            offset += len(docs)
+            total = data.get("numFound", data.get("num_found", 0))
+
+            pending = None
+            if docs and offset < total and page_limit(offset) > 0:
+                pending = executor.submit(fetch, offset)
+
+            for doc in docs:
+                yield doc
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
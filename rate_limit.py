@@ -0,0 +1,107 @@
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date), or None."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class HostRateLimiter:
+    """Per-host request pacing.
+
+    Every host gets its own schedule of evenly spaced request slots, so
+    concurrent callers hitting the same host are held to `rate` requests
+    per second while callers for other hosts are not delayed at all.
+    """
+
+    def __init__(self, rate=5.0, burst=1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.interval = 1.0 / rate
+        self._next_slot = {}
+
+    def _reserve(self, url):
+        host = urlparse(url).netloc or url
+        now = time.monotonic()
+        # Allow up to `burst` requests to go out back to back after an idle period
+        earliest = now - (self.burst - 1) * self.interval
+        slot = max(earliest, self._next_slot.get(host, earliest))
+        self._next_slot[host] = slot + self.interval
+        return slot - now
+
+
+class AdaptiveRateController(HostRateLimiter):
+    """Per-host AIMD pacing driven by the responses it lets through.
+
+    Each host starts at `rate` requests per second. Every successful response
+    faster than `target_latency` adds `increase` to that host's rate, up to
+    `max_rate`. A 429 or 503, a Retry-After header or a failed request
+    multiplies it by `decrease`, down to `min_rate`, and a Retry-After also
+    holds the host's next request until it has passed.
+    """
+
+    def __init__(self, rate=1.0, min_rate=0.1, max_rate=10.0, increase=0.2, decrease=0.5,
+                 target_latency=1.0, burst=1):
+        super().__init__(rate=rate, burst=burst)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.target_latency = target_latency
+        self.rates = {}
+        self._lock = threading.Lock()
+
+    def host_rate(self, url):
+        host = urlparse(url).netloc or url
+        with self._lock:
+            return self.rates.get(host, self.rate)
+
+    def _reserve(self, url):
+        host = urlparse(url).netloc or url
+        with self._lock:
+            interval = 1.0 / self.rates.setdefault(host, self.rate)
+            now = time.monotonic()
+            earliest = now - (self.burst - 1) * interval
+            slot = max(earliest, self._next_slot.get(host, earliest))
+            self._next_slot[host] = slot + interval
+        return slot - now
+
+    def wait(self, url):
+        """Block until the host's next request slot."""
+        delay = self._reserve(url)
+        if delay > 0:
+            time.sleep(delay)
+
+    def record(self, url, status, latency, retry_after=None):
+        """Feed one response (status None for a failed request) back into the host's rate."""
+        host = urlparse(url).netloc or url
+        with self._lock:
+            rate = self.rates.get(host, self.rate)
+            if status is None or status in (429, 503) or retry_after is not None:
+                rate = max(self.min_rate, rate * self.decrease)
+                if retry_after:
+                    resume = time.monotonic() + retry_after
+                    self._next_slot[host] = max(self._next_slot.get(host, resume), resume)
+            elif status < 400 and latency <= self.target_latency:
+                rate = min(self.max_rate, rate + self.increase)
+            self.rates[host] = rate
+        return rate
+
+    def describe(self):
+        with self._lock:
+            rates = dict(self.rates)
+        if not rates:
+            return "Request rate: no requests yet"
+        return "Request rate: " + ", ".join(f"{host} {rate:.1f}/s" for host, rate in sorted(rates.items()))
@@ -0,0 +1,194 @@
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from urllib.parse import urlparse
+
+import requests
+
+from rate_limit import parse_retry_after
+
+try:
+    import httpx
+    RETRYABLE_ERRORS = (requests.ConnectionError, requests.Timeout, httpx.TransportError)
+except ImportError:
+    RETRYABLE_ERRORS = (requests.ConnectionError, requests.Timeout)
+
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS'}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class RetryBudget:
+    """Process-wide allowance for retries and hedges.
+
+    Every first attempt deposits `ratio` tokens, up to `max_tokens`, and
+    every retry or hedge spends one. While a service is failing, the extra
+    traffic therefore stays near `ratio` of normal load instead of
+    multiplying it.
+    """
+
+    def __init__(self, ratio=0.2, initial_tokens=10, max_tokens=100):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = initial_tokens
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def withdraw(self):
+        with self._lock:
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+GLOBAL_RETRY_BUDGET = RetryBudget()
+
+
+class RequestPolicy:
+    """Retries with jittered backoff, plus optional hedging for idempotent requests.
+
+    Connection errors, timeouts and RETRY_STATUSES are retried up to
+    `max_retries` times, sleeping a random time up to `backoff * 2**attempt`
+    (or the Retry-After, if longer), while the retry budget allows it. With
+    `hedge_percentile` set, a GET still unanswered after that percentile of
+    the host's recent latencies gets a duplicate request. The first copy to
+    answer with a status outside RETRY_STATUSES is used; a retryable answer
+    only wins if the other copy does no better. Call `close()` when done.
+    """
+
+    def __init__(self, max_retries=3, backoff=0.5, max_backoff=10.0, budget=None,
+                 hedge_percentile=None, hedge_min_samples=20, hedge_workers=16):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.budget = budget or GLOBAL_RETRY_BUDGET
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.stats = {'requests': 0, 'retries': 0, 'retries_denied': 0, 'hedged': 0, 'hedge_wins': 0, 'failed': 0}
+        self.latencies = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=hedge_workers) if hedge_percentile else None
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _observe(self, host, latency):
+        with self._lock:
+            self.latencies.setdefault(host, deque(maxlen=200)).append(latency)
+
+    def hedge_delay(self, host):
+        with self._lock:
+            samples = sorted(self.latencies.get(host, ()))
+        if not self.hedge_percentile or len(samples) < self.hedge_min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * self.hedge_percentile / 100))]
+
+    def send(self, send, request, hedge=True, admit=None):
+        """Run `send(request)` under the policy and return its final response.
+
+        `admit(request)` runs before every attempt, outside the timed and
+        hedged part, so waiting on a rate limiter is neither counted as
+        latency nor able to trigger a hedge.
+        """
+        host = urlparse(request.url).netloc
+        idempotent = request.method in IDEMPOTENT_METHODS
+        self._count('requests')
+        self.budget.deposit()
+
+        attempt = 0
+        while True:
+            response, error = None, None
+            if admit is not None:
+                admit(request)
+            try:
+                response = self._attempt(send, request, host, hedge and idempotent)
+            except RETRYABLE_ERRORS as e:
+                error = e
+
+            if error is None and response.status_code not in RETRY_STATUSES:
+                return response
+
+            if attempt >= self.max_retries or not idempotent or not self.budget.withdraw():
+                if attempt < self.max_retries and idempotent:
+                    self._count('retries_denied')
+                self._count('failed')
+                if error is not None:
+                    raise error
+                return response
+
+            delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+            if response is not None:
+                delay = max(delay, parse_retry_after(response.headers.get('Retry-After')) or 0)
+                response.close()
+            self._count('retries')
+            time.sleep(delay)
+            attempt += 1
+
+    def _attempt(self, send, request, host, hedge):
+        threshold = self.hedge_delay(host) if hedge and self._executor else None
+        if threshold is None:
+            start = time.monotonic()
+            response = send(request)
+            self._observe(host, time.monotonic() - start)
+            return response
+
+        started = threading.Event()
+
+        def send_primary():
+            started.set()
+            return send(request)
+
+        primary = self._executor.submit(send_primary)
+        # Time spent queued behind other hedged requests is not the server's latency
+        started.wait()
+        start = time.monotonic()
+        done, _ = wait([primary], timeout=threshold)
+        if done or not self.budget.withdraw():
+            response = primary.result()
+            self._observe(host, time.monotonic() - start)
+            return response
+
+        self._count('hedged')
+        backup = self._executor.submit(send, request.copy())
+        futures = [primary, backup]
+        answered = []
+        for future in as_completed(futures):
+            if future.exception() is None:
+                answered.append(future)
+                if future.result().status_code not in RETRY_STATUSES:
+                    break
+        if not answered:
+            # Both copies failed: surface the original request's error
+            return primary.result()
+
+        # Either the first usable answer, or the last retryable one for send() to retry
+        winner = answered[-1]
+        for other in futures:
+            if other is not winner:
+                other.add_done_callback(_close_response)
+        if winner is backup:
+            self._count('hedge_wins')
+        self._observe(host, time.monotonic() - start)
+        return winner.result()
+
+    def close(self):
+        if self._executor:
+            self._executor.shutdown(wait=True)
+
+    def describe(self):
+        with self._lock:
+            stats = dict(self.stats)
+        return (f"Requests: {stats['requests']} sent, {stats['retries']} retried, {stats['retries_denied']} retries over budget, "
+                f"{stats['hedged']} hedged ({stats['hedge_wins']} won by the hedge), {stats['failed']} failed")
+
+
+def _close_response(future):
+    # The losing copy of a hedged request still has to give its connection back
+    if future.exception() is None:
+        future.result().close()
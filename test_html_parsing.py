@@ -0,0 +1,89 @@
+import importlib.util
+import json
+import os
+import sys
+
+import pytest
+
+from html_parsing import DEFAULT_PARSER, available_parsers, make_soup
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SAVED_ARTICLE = os.path.join(HERE, 'fixtures', 'wikipedia_article.html')
+
+
+def load_script(filename):
+    # Same loader as bench_parsers.py; registered so pickled parse calls find the module
+    name = filename.replace(' ', '_')[:-3]
+    spec = importlib.util.spec_from_file_location(name, os.path.join(HERE, filename))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+wiki = load_script('http wiki.py')
+
+
+def saved_record(parser, restrict_parsing):
+    with open(SAVED_ARTICLE, 'rb') as f:
+        content = f.read()
+    record = wiki.parse_page_content(content, 'https://en.wikipedia.org/wiki/Solar_power', parser, restrict_parsing)
+    del record['scraped_at']
+    return record
+
+
+def test_default_parser_is_html_parser():
+    assert DEFAULT_PARSER == 'html.parser'
+    assert make_soup('<p>a</p>').builder.NAME == 'html.parser'
+
+
+@pytest.mark.parametrize('parser', available_parsers())
+def test_restricted_parse_matches_full_parse(parser):
+    full = saved_record(parser, restrict_parsing=False)
+    assert saved_record(parser, restrict_parsing=True) == full
+    assert full['title'] == 'Solar power'
+    assert len(full['images']) == 2
+    assert full['categories'] == [
+        'Solar power', 'Renewable energy', 'Electric power generation', 'Articles with short description'
+    ]
+
+
+class StubResponse:
+    status_code = 200
+    raw = None
+
+    def __init__(self, url, content):
+        self.url = url
+        self.content = content
+        self.headers = {'Content-Length': str(len(content))}
+
+    def raise_for_status(self):
+        pass
+
+
+class RandomSession:
+    """Redirects Special:Random to the saved article and answers action=parse for it."""
+
+    def __init__(self):
+        self.requests = []
+
+    def get(self, url, params=None, **kwargs):
+        self.requests.append((url, params))
+        if url.endswith('Special:Random'):
+            with open(SAVED_ARTICLE, 'rb') as f:
+                return StubResponse('https://en.wikipedia.org/wiki/Solar_power', f.read())
+        page = {'title': params['page'], 'text': '<p>Sunlight into electricity.</p>',
+                'categories': [{'category': 'Solar_power'}]}
+        return StubResponse(url, json.dumps({'parse': page}).encode())
+
+
+@pytest.mark.parametrize('content_mode, requests_per_article', [('html', 1), ('parse', 2)])
+def test_random_articles_follow_content_mode(content_mode, requests_per_article):
+    scraper = wiki.WikipediaHTTPScraper(content_mode=content_mode)
+    scraper.session = RandomSession()
+    articles = scraper.get_random_articles(count=2)
+    assert [article['title'] for article in articles] == ['Solar power', 'Solar power']
+    assert len(scraper.session.requests) == 2 * requests_per_article
+    stats = scraper.content_stats[content_mode]
+    assert stats['pages'] == 2
+    assert stats['bytes'] > 0 and stats['parse_seconds'] > 0
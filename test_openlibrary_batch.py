@@ -0,0 +1,67 @@
+import importlib.util
+import os
+import sys
+from urllib.parse import urlparse
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_script(filename):
+    # Same loader as bench_parsers.py, for the scripts with spaces in their names
+    name = filename.replace(' ', '_')[:-3]
+    spec = importlib.util.spec_from_file_location(name, os.path.join(HERE, filename))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+openlibrary = load_script('openlibrary http.py')
+
+
+class StubResponse:
+    status_code = 200
+
+    def __init__(self, data):
+        self.data = data
+
+    def json(self):
+        return self.data
+
+
+class StubSession:
+    """Answers search.json and /api/books like Open Library, and counts every request."""
+
+    def __init__(self):
+        self.paths = []
+
+    def get(self, url, params=None, **kwargs):
+        path = urlparse(url).path
+        self.paths.append(path)
+        if path == '/search.json':
+            keys = params['q'][len('key:('):-1].replace('"', '').split(' OR ')
+            return StubResponse({'docs': [
+                {'key': key, 'title': f"Title {key}", 'cover_edition_key': key.split('/')[-1] + 'M',
+                 'last_modified_i': 1697860948}
+                for key in keys
+            ]})
+        if path == '/api/books':
+            return StubResponse({
+                bibkey: {'details': {'description': f"About {bibkey}"}} for bibkey in params['bibkeys'].split(',')
+            })
+        return StubResponse({'title': 'Work', 'description': 'Per-work', 'created': {'value': '2009-01-01T00:00:00'}})
+
+
+def test_batch_of_100_works_takes_a_few_requests():
+    scraper = openlibrary.OpenLibraryHTTPScraper()
+    scraper.session = StubSession()
+    keys = [f"/works/OL{number}W" for number in range(100)]
+
+    details = scraper.get_books_details(keys)
+
+    assert len(details) == 100
+    assert all(details[key]['description'] for key in keys)
+    assert details[keys[0]]['last_modified'] == '2023-10-21T04:02:28.000000'
+    # Two search.json and two /api/books pages of 50, no per-work requests
+    assert sorted(scraper.session.paths) == ['/api/books'] * 2 + ['/search.json'] * 2
+    scraper.request_policy.close()
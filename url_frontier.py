@@ -0,0 +1,152 @@
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import struct
+from collections import OrderedDict
+
+BLOOM_HEADER = struct.Struct('<4sQIQ')
+BLOOM_MAGIC = b'BLM1'
+
+
+class BloomFilter:
+    """Compact set membership with a bounded false-positive rate.
+
+    Sized for `capacity` keys at `error_rate`: about 1.8 MB for a million
+    keys at 0.1%. Keys are never reported missing once added, but an unseen
+    key can occasionally be reported present.
+    """
+
+    def __init__(self, capacity=1_000_000, error_rate=0.001):
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.count = 0
+        self.bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        first, second = struct.unpack('<QQ', digest)
+        return [(first + i * second) % self.num_bits for i in range(self.num_hashes)]
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    def add(self, key):
+        """Add a key; returns False if it (probably) was already present."""
+        added = False
+        for position in self._positions(key):
+            mask = 1 << (position & 7)
+            if not self.bits[position >> 3] & mask:
+                self.bits[position >> 3] |= mask
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    def save(self, path):
+        temp_path = path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(BLOOM_HEADER.pack(BLOOM_MAGIC, self.num_bits, self.num_hashes, self.count))
+            f.write(self.bits)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            magic, num_bits, num_hashes, count = BLOOM_HEADER.unpack(f.read(BLOOM_HEADER.size))
+            if magic != BLOOM_MAGIC:
+                raise ValueError(f"{path} is not a saved BloomFilter")
+            bloom = cls.__new__(cls)
+            bloom.num_bits, bloom.num_hashes, bloom.count = num_bits, num_hashes, count
+            bloom.bits = bytearray(f.read())
+        return bloom
+
+
+class URLFrontier:
+    """Remembers which pages a crawl has scraped, across topics and across runs.
+
+    `canonicalize(url)` maps every URL form of a page to one key, so
+    another topic can reuse a scraped record without a fetch. With
+    `records_path`, records live in SQLite behind an LRU of `lru_size`
+    entries, so memory stays flat however long the crawl runs, and pages
+    the Bloom filter saved at `path` saw in earlier runs are served from
+    there too; a Bloom false positive finds no stored record and is
+    reported as 'new'. Without a records file, this run's records are
+    kept in memory and keys from earlier runs are reported as 'seen', and
+    callers skip them.
+    """
+
+    def __init__(self, canonicalize, path=None, records_path=None, capacity=1_000_000, error_rate=0.001,
+                 lru_size=1024):
+        self.canonicalize = canonicalize
+        self.path = path
+        if path and os.path.exists(path):
+            self.seen = BloomFilter.load(path)
+        else:
+            self.seen = BloomFilter(capacity, error_rate)
+        self.lru_size = lru_size
+        self.records = OrderedDict()
+        self.stats = {'new': 0, 'reused': 0, 'seen': 0, 'restored': 0, 'false_positives': 0}
+
+        self._db = None
+        if records_path:
+            self._db = sqlite3.connect(records_path)
+            self._db.execute('CREATE TABLE IF NOT EXISTS records (key TEXT PRIMARY KEY, data TEXT)')
+
+    def _cache(self, key, record):
+        self.records[key] = record
+        if self._db is not None:
+            # Only bounded when every record can be read back from SQLite
+            self.records.move_to_end(key)
+            while len(self.records) > self.lru_size:
+                self.records.popitem(last=False)
+
+    def _stored_record(self, key):
+        row = self._db.execute('SELECT data FROM records WHERE key = ?', (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def lookup(self, url):
+        """('reused', record), ('seen', None) for an earlier run, or ('new', None)."""
+        key = self.canonicalize(url)
+        if key in self.records:
+            status, record = 'reused', self.records[key]
+            self.records.move_to_end(key)
+        elif key not in self.seen:
+            status, record = 'new', None
+        elif self._db is None:
+            status, record = 'seen', None
+        else:
+            record = self._stored_record(key)
+            if record is None:
+                status = 'new'
+                self.stats['false_positives'] += 1
+            else:
+                status = 'reused'
+                self._cache(key, record)
+                self.stats['restored'] += 1
+        self.stats[status] += 1
+        return status, record
+
+    def remember(self, record, *urls):
+        """Store a scraped record under the canonical key of every URL that led to it."""
+        for url in urls:
+            key = self.canonicalize(url)
+            self._cache(key, record)
+            self.seen.add(key)
+            if self._db is not None:
+                self._db.execute(
+                    'INSERT OR REPLACE INTO records (key, data) VALUES (?, ?)',
+                    (key, json.dumps(record, ensure_ascii=False))
+                )
+
+    def save(self):
+        # Records and Bloom bits are written together, so a crashed run leaves neither behind
+        if self._db is not None:
+            self._db.commit()
+        if self.path:
+            self.seen.save(self.path)
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
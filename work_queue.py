@@ -0,0 +1,172 @@
+import glob
+import json
+import os
+import socket
+import sqlite3
+import time
+
+from ndjson_sink import NDJSONSink, iter_ndjson
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class WorkQueue:
+    """Durable job queue that several worker processes lease jobs from.
+
+    Jobs live in one SQLite file, so any process that can open the directory
+    can take part. A leased job belongs to its worker until `lease_seconds`
+    pass; after that any worker may take it again, so jobs held by a crashed
+    worker are retried. A job that fails or is abandoned `max_attempts` times
+    is marked failed. A worker that overruns its lease can see its job run
+    again elsewhere, so delivery is at-least-once and shard readers should
+    dedupe by URL. The rollback journal is used instead of WAL, because WAL
+    needs shared memory and does not work on network filesystems.
+    """
+
+    def __init__(self, directory='crawl_queue', lease_seconds=300, max_attempts=3):
+        self.directory = directory
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+
+        os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(directory, 'jobs.sqlite'), timeout=60, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=DELETE')
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                key TEXT UNIQUE,
+                kind TEXT,
+                payload TEXT,
+                state TEXT DEFAULT 'pending',
+                attempts INTEGER DEFAULT 0,
+                worker TEXT,
+                lease_expires REAL,
+                error TEXT
+            )
+        """)
+        self._db.execute('CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, lease_expires)')
+
+    def put(self, kind, payload, key=None):
+        """Add a job; returns False if a job with the same key was already queued."""
+        key = key or f"{kind}:{json.dumps(payload, sort_keys=True)}"
+        cursor = self._db.execute(
+            'INSERT OR IGNORE INTO jobs (key, kind, payload) VALUES (?, ?, ?)',
+            (key, kind, json.dumps(payload, ensure_ascii=False))
+        )
+        return cursor.rowcount == 1
+
+    def put_many(self, jobs):
+        """Add (kind, payload, key) tuples in one transaction; returns how many were new."""
+        self._db.execute('BEGIN IMMEDIATE')
+        try:
+            added = sum(self.put(kind, payload, key) for kind, payload, key in jobs)
+        except Exception:
+            self._db.execute('ROLLBACK')
+            raise
+        self._db.execute('COMMIT')
+        return added
+
+    def lease(self, worker_id, kinds=None):
+        """Claim the oldest pending or expired job, or return None if there is none."""
+        now = time.time()
+        kind_filter = ''
+        params = [now]
+        if kinds:
+            kind_filter = f" AND kind IN ({','.join('?' * len(kinds))})"
+            params.extend(kinds)
+
+        self._db.execute('BEGIN IMMEDIATE')
+        try:
+            while True:
+                row = self._db.execute(
+                    "SELECT id, kind, payload, attempts FROM jobs "
+                    "WHERE (state = 'pending' OR (state = 'leased' AND lease_expires < ?))" + kind_filter +
+                    " ORDER BY id LIMIT 1",
+                    params
+                ).fetchone()
+                if row is None:
+                    self._db.execute('COMMIT')
+                    return None
+
+                job_id, kind, payload, attempts = row
+                if attempts >= self.max_attempts:
+                    self._db.execute(
+                        "UPDATE jobs SET state = 'failed', error = COALESCE(error, 'lease expired') WHERE id = ?",
+                        (job_id,)
+                    )
+                    continue
+
+                self._db.execute(
+                    "UPDATE jobs SET state = 'leased', worker = ?, lease_expires = ?, attempts = attempts + 1 WHERE id = ?",
+                    (worker_id, now + self.lease_seconds, job_id)
+                )
+                self._db.execute('COMMIT')
+                return {'id': job_id, 'kind': kind, 'payload': json.loads(payload), 'attempts': attempts + 1}
+        except Exception:
+            self._db.execute('ROLLBACK')
+            raise
+
+    def complete(self, job, worker_id):
+        self._db.execute(
+            "UPDATE jobs SET state = 'done', lease_expires = NULL WHERE id = ? AND worker = ?",
+            (job['id'], worker_id)
+        )
+
+    def fail(self, job, worker_id, error):
+        state = 'failed' if job['attempts'] >= self.max_attempts else 'pending'
+        self._db.execute(
+            "UPDATE jobs SET state = ?, error = ?, lease_expires = NULL WHERE id = ? AND worker = ?",
+            (state, str(error), job['id'], worker_id)
+        )
+
+    def has_open_jobs(self):
+        row = self._db.execute("SELECT 1 FROM jobs WHERE state IN ('pending', 'leased') LIMIT 1").fetchone()
+        return row is not None
+
+    def counts(self):
+        rows = self._db.execute('SELECT state, COUNT(*) FROM jobs GROUP BY state').fetchall()
+        return {state: count for state, count in rows}
+
+    def close(self):
+        self._db.close()
+
+
+def shard_sink(directory, prefix, worker_id):
+    """Per-worker output file, so workers never append to the same NDJSON file."""
+    return NDJSONSink(os.path.join(directory, f"{prefix}.{worker_id}.ndjson"), append=True)
+
+
+def iter_shards(directory, prefix):
+    for path in sorted(glob.glob(os.path.join(directory, f"{prefix}.*.ndjson"))):
+        yield from iter_ndjson(path)
+
+
+def run_worker(queue, handlers, worker_id=None, idle_wait=5.0, max_idle=3):
+    """Lease and run jobs until no job has been pending or leased for `max_idle` polls.
+
+    `handlers` maps a job kind to `handler(payload)`. A handler may put
+    follow-up jobs on the queue; if it raises, the job is released for
+    another attempt.
+    """
+    worker_id = worker_id or default_worker_id()
+    done = idle = 0
+    while idle < max_idle:
+        job = queue.lease(worker_id, kinds=list(handlers))
+        if job is None:
+            # Jobs leased by other workers may still add follow-ups or expire and need a retry
+            idle = 0 if queue.has_open_jobs() else idle + 1
+            time.sleep(idle_wait)
+            continue
+
+        idle = 0
+        try:
+            handlers[job['kind']](job['payload'])
+        except Exception as e:
+            print(f"Job {job['kind']} {job['id']} failed (attempt {job['attempts']}): {e}")
+            queue.fail(job, worker_id, e)
+        else:
+            queue.complete(job, worker_id)
+            done += 1
+    return done